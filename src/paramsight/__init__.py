@@ -1,5 +1,62 @@
 import paramsight._paramsight as _paramsight
-from paramsight._paramsight import get_resolved_typevars_for_base
+from paramsight._dispatch import ParamDispatcher, param_dispatch
+from paramsight._param_index import ParamIndex
+from paramsight._param_table import (
+    build_param_table,
+    get_parameter_map,
+    precompute_params,
+)
+from paramsight._paramsight import (
+    get_resolution_plan,
+    get_resolution_plans,
+    get_resolved_typevars_for_base,
+    get_resolved_typevars_for_base_inst,
+    get_resolved_typevars_for_bases,
+    invalidate,
+    is_instance_of,
+    is_subalias,
+    resolve_many,
+    resolve_many_inst,
+    resolved_type_hints,
+    set_resolution_engine,
+    try_resolve,
+)
+from paramsight._plan import PlanEntry, ResolutionPlan, plan_cache
+from paramsight._prewarm import prewarm
+from paramsight._resolution_cache import resolution_cache
+from paramsight._snapshot import load_snapshot, save_snapshot
+from paramsight._specialize import specialize
+from paramsight._type_param import TypeParam
 from paramsight.aliasclassmethod import takes_alias
 
-__all__ = ["takes_alias", "get_resolved_typevars_for_base"]
+__all__ = [
+    "takes_alias",
+    "TypeParam",
+    "specialize",
+    "get_resolved_typevars_for_base",
+    "get_resolved_typevars_for_bases",
+    "try_resolve",
+    "get_resolved_typevars_for_base_inst",
+    "get_parameter_map",
+    "get_resolution_plan",
+    "get_resolution_plans",
+    "resolve_many",
+    "resolve_many_inst",
+    "is_instance_of",
+    "is_subalias",
+    "resolved_type_hints",
+    "param_dispatch",
+    "ParamDispatcher",
+    "ParamIndex",
+    "set_resolution_engine",
+    "invalidate",
+    "precompute_params",
+    "build_param_table",
+    "prewarm",
+    "save_snapshot",
+    "load_snapshot",
+    "PlanEntry",
+    "ResolutionPlan",
+    "plan_cache",
+    "resolution_cache",
+]
@@ -0,0 +1,61 @@
+import threading
+from collections.abc import Callable, Hashable
+from types import GenericAlias, ModuleType
+from typing import Any
+
+from paramsight._class_versions import PerClassCache
+from paramsight.type_utils import specialization_key, typed_args
+
+
+class AliasCache:
+    """
+    values computed per (alias, key). like ResolutionCache, entries for an
+    alias are stored under its origin and keyed by (args, key), while a plain
+    class (what an instance without __orig_class__ has, including pydantic
+    parametrized models) keys its entries by key alone. both tables are
+    PerClassCaches.
+    """
+
+    def __init__(self, max_entries_per_class: int = 256):
+        self._lock = threading.Lock()
+        self._entries = PerClassCache(max_entries_per_class, self._lock)
+        self._by_class = PerClassCache(max_entries_per_class, self._lock)
+
+    @property
+    def max_entries_per_class(self) -> int:
+        return self._entries.max_entries_per_class
+
+    @max_entries_per_class.setter
+    def max_entries_per_class(self, value: int) -> None:
+        self._entries.max_entries_per_class = value
+        self._by_class.max_entries_per_class = value
+
+    def get_or_compute(
+        self,
+        alias: type | GenericAlias,
+        key: Hashable,
+        compute: Callable[[], Any],
+    ) -> Any:
+        if isinstance(alias, type):
+            return self._by_class.get_or_compute(alias, key, compute)
+        origin, args = specialization_key(alias)
+        return self._entries.get_or_compute(origin, (typed_args(args), key), compute)
+
+    def invalidate(self, module: ModuleType | str) -> None:
+        self._entries.invalidate(module)
+        self._by_class.invalidate(module)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_class.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._by_class)
+
+
+# is_subalias answers, keyed by target
+subalias_cache = AliasCache()
+# resolved_type_hints results, keyed by include_extras
+type_hints_cache = AliasCache()
+# specialize variants, keyed by the undecorated function
+variant_cache = AliasCache()
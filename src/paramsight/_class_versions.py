@@ -0,0 +1,163 @@
+import threading
+import weakref
+from collections.abc import Callable, Hashable, MutableMapping
+from contextlib import AbstractContextManager
+from types import ModuleType
+from typing import Any
+
+from paramsight.type_utils import get_args_robust, get_origin_robust, is_generic_alias
+
+_MISSING = object()
+
+
+class ClassVersions:
+    """
+    the live class for each (module, qualname) stamp. reloading a module
+    defines its classes again under the same stamps; replaced() reports the
+    class a new definition took over from, so a cache can drop what it
+    stored for the old one.
+
+    classes defined in a function share a qualname between calls without
+    being redefinitions, so they are not stamped.
+    """
+
+    def __init__(self):
+        self._current: dict[tuple[str, str], weakref.ref[type]] = {}
+
+    def replaced(self, cls: type) -> type | None:
+        qualname = getattr(cls, "__qualname__", "")
+        if "<locals>" in qualname:
+            return None
+        stamp = (getattr(cls, "__module__", ""), qualname)
+        current = self._current.get(stamp)
+        previous = None if current is None else current()
+        if previous is cls:
+            return None
+        self._current[stamp] = weakref.ref(cls)
+        return previous
+
+    def clear(self) -> None:
+        self._current.clear()
+
+
+def module_name(module: ModuleType | str) -> str:
+    return module if isinstance(module, str) else module.__name__
+
+
+def mentions_module(obj: Any, module: str) -> bool:
+    """
+    whether obj is, or is built from, a class defined in module. walks
+    aliases, their args and tuples of them, eg. a cache key or result.
+    """
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, tuple | list):
+            stack.extend(obj)
+        elif is_generic_alias(obj):
+            stack.append(get_origin_robust(obj))
+            stack.extend(get_args_robust(obj))
+        elif isinstance(obj, type) and obj.__module__ == module:
+            return True
+    return False
+
+
+def invalidate_per_class(
+    per_class: MutableMapping[type, dict[Any, Any]],
+    module: str,
+    contents: Callable[[Any], Any] = lambda value: value,
+) -> None:
+    """
+    drops from a {class: {key: value}} cache every class defined in module,
+    and every entry whose key or the contents of whose value mention it.
+    """
+    for cls, entries in list(per_class.items()):
+        if cls.__module__ == module:
+            del per_class[cls]
+            continue
+        for key, value in list(entries.items()):
+            if mentions_module((key, contents(value)), module):
+                del entries[key]
+
+
+class PerClassCache:
+    """
+    values computed per (class, key), held in a {class: {key: value}} table.
+    classes are held weakly, so caching something about a dynamically
+    created class (eg. a pydantic parametrized model or a locally defined
+    generic) never keeps it alive. keys and values are held strongly, so each
+    class keeps at most max_entries_per_class entries, dropping the oldest
+    stored first.
+
+    lookups take no lock; a miss is computed outside the lock, and only
+    storing the result is serialized (with lock, which caches holding
+    several tables share). hits don't reorder entries. keys that can't be
+    hashed, eg. args carrying Annotated metadata, are computed every time.
+    under contention the hit / miss counters are approximate.
+
+    on_new_class is called, with the lock held, for each class before its
+    first entry is stored.
+    """
+
+    def __init__(
+        self,
+        max_entries_per_class: int = 256,
+        lock: AbstractContextManager[Any] | None = None,
+        on_new_class: Callable[[type], None] | None = None,
+    ):
+        self.max_entries_per_class = max_entries_per_class
+        self.entries: weakref.WeakKeyDictionary[type, dict[Hashable, Any]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self.lock = threading.Lock() if lock is None else lock
+        self.on_new_class = on_new_class
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(
+        self, cls: type, key: Hashable, compute: Callable[[], Any]
+    ) -> Any:
+        try:
+            per_class = self.entries.get(cls)
+            result = _MISSING if per_class is None else per_class.get(key, _MISSING)
+        except TypeError:  # unhashable key
+            self.misses += 1
+            return compute()
+        if result is not _MISSING:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = compute()
+        with self.lock:
+            per_class = self.entries.get(cls)
+            if per_class is None:
+                if self.on_new_class is not None:
+                    self.on_new_class(cls)
+                per_class = self.entries[cls] = {}
+            per_class[key] = result
+            if len(per_class) > self.max_entries_per_class:
+                del per_class[next(iter(per_class))]
+        return result
+
+    def pop(self, cls: type) -> None:
+        """
+        drops the entries of cls. call it with the lock held.
+        """
+        self.entries.pop(cls, None)
+
+    def invalidate(self, module: ModuleType | str) -> None:
+        """
+        drops the entries of classes defined in module, and entries whose
+        key or value mention one.
+        """
+        with self.lock:
+            invalidate_per_class(self.entries, module_name(module))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in list(self.entries.values()))
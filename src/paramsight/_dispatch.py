@@ -0,0 +1,187 @@
+import functools
+import threading
+import types
+from collections.abc import Callable
+from typing import Any, get_origin
+
+from paramsight._class_versions import PerClassCache
+from paramsight._paramsight import _effective_alias, try_resolve
+from paramsight.type_utils import (
+    get_num_typevars,
+    is_generic_alias,
+    specialization_key,
+    typed_args,
+)
+
+
+def _alias_origin(alias: Any) -> type | None:
+    """
+    the class alias specializes (a class is its own), or None for special
+    forms whose origin isn't a class, eg. Optional[int] or Literal[1].
+    """
+    if isinstance(alias, type):  # including parametrized pydantic models
+        return specialization_key(alias)[0]
+    origin = get_origin(alias)
+    return origin if isinstance(origin, type) else None
+
+
+def _params_for(base: type, params: tuple[Any, ...]) -> tuple[Any, ...]:
+    """
+    the parameters of base given either as an alias of it, eg. (Codec[int],),
+    or as the parameters themselves, eg. (int,).
+    """
+    if (
+        len(params) == 1
+        and is_generic_alias(params[0])
+        and _alias_origin(params[0]) is base
+    ):
+        params = specialization_key(params[0])[1]
+    if len(params) != get_num_typevars(base):
+        raise ValueError(
+            f"{base} takes {get_num_typevars(base)} type parameters, "
+            f"got {len(params)}: {params}"
+        )
+    return params
+
+
+def _is_alias_or_class(arg: Any) -> bool:
+    return isinstance(arg, type) or is_generic_alias(arg)
+
+
+def _matches(registered: Any, resolved: Any) -> bool:
+    if registered == resolved:
+        return True
+    if not isinstance(registered, type) or not _is_alias_or_class(resolved):
+        return False
+    # a plain registered class also matches subclasses and aliases of them
+    origin = _alias_origin(resolved)
+    return origin is not None and issubclass(origin, registered)
+
+
+def _more_specific(a: tuple[Any, ...], b: tuple[Any, ...]) -> bool:
+    return a != b and all(_matches(y, x) for x, y in zip(a, b, strict=True))
+
+
+class ParamDispatcher:
+    """
+    calls the implementation registered for the type parameters its first
+    argument (an alias, class or instance) resolves to on base. the
+    implementation for each alias is found once and kept in a PerClassCache
+    of the origin class, so repeated calls are a dict hit.
+    """
+
+    def __init__(
+        self,
+        base: type,
+        default: Callable[..., Any],
+        max_entries_per_class: int = 256,
+    ):
+        self.base = base
+        self.default = default
+        self.registry: dict[tuple[Any, ...], Callable[..., Any]] = {}
+        self._lock = threading.Lock()
+        self._table = PerClassCache(max_entries_per_class, self._lock)
+        functools.update_wrapper(self, default)
+
+    @property
+    def max_entries_per_class(self) -> int:
+        return self._table.max_entries_per_class
+
+    @max_entries_per_class.setter
+    def max_entries_per_class(self, value: int) -> None:
+        self._table.max_entries_per_class = value
+
+    def register(
+        self, *params: Any
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """
+        registers the decorated function for the given parameters of base,
+        written either as the alias (`Codec[int]`) or as the parameters
+        themselves (`int`, or `int, str` for a base with two).
+        """
+        params = _params_for(self.base, params)
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            with self._lock:
+                self.registry[params] = func
+                self._table.entries.clear()
+            return func
+
+        return decorator
+
+    def dispatch(self, arg: Any) -> Callable[..., Any]:
+        """
+        the implementation a call with arg as first argument runs.
+        """
+        alias = arg if _is_alias_or_class(arg) else _effective_alias(arg)
+        origin, args = specialization_key(alias)
+        return self._table.get_or_compute(
+            origin, typed_args(args), lambda: self._find(alias)
+        )
+
+    def _find(self, alias: type | types.GenericAlias) -> Callable[..., Any]:
+        resolved = try_resolve(alias, self.base, substitute_nested=True)
+        if resolved is None:  # not a specialization of base
+            return self.default
+        try:
+            impl = self.registry.get(resolved)
+        except TypeError:
+            impl = None
+        if impl is not None:
+            return impl
+        candidates = [
+            params
+            for params in self.registry
+            if all(_matches(r, v) for r, v in zip(params, resolved, strict=True))
+        ]
+        best = [
+            params
+            for params in candidates
+            if not any(_more_specific(other, params) for other in candidates)
+        ]
+        if not best:
+            return self.default
+        if len(best) > 1:
+            raise RuntimeError(
+                f"ambiguous dispatch for {alias}, resolved to {resolved} on "
+                f"{self.base}: {best} all match"
+            )
+        return self.registry[best[0]]
+
+    def cache_clear(self) -> None:
+        self._table.clear()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if not args:
+            raise TypeError(
+                f"{self.__name__} requires at least one positional argument"
+            )
+        return self.dispatch(args[0])(*args, **kwargs)
+
+    def __get__(self, instance: Any, owner: type | None = None) -> Any:
+        if instance is None:
+            return self
+        return types.MethodType(self, instance)
+
+
+def param_dispatch(
+    base: type,
+) -> Callable[[Callable[..., Any]], ParamDispatcher]:
+    """
+    like functools.singledispatch, but dispatching on the type parameters the
+    first argument resolves to on base, eg.
+
+        @param_dispatch(Codec)
+        def encode(codec, value): ...  # the fallback
+
+        @encode.register(Codec[int])
+        def _(codec, value): ...
+
+    a registered class also matches its subclasses; the most specific match
+    wins.
+    """
+
+    def decorator(func: Callable[..., Any]) -> ParamDispatcher:
+        return ParamDispatcher(base, func)
+
+    return decorator
@@ -0,0 +1,30 @@
+import hashlib
+import sys
+from pathlib import Path
+from types import ModuleType
+
+from paramsight._class_versions import module_name
+
+_module_hashes: dict[str, str | None] = {}
+
+
+def module_fingerprint(name: str) -> str | None:
+    """
+    hash of an imported module's source, computed once per process (or once
+    per invalidate of the module). None for modules without a source file.
+    """
+    if name not in _module_hashes:
+        path = getattr(sys.modules.get(name), "__file__", None)
+        try:
+            digest = hashlib.sha256(Path(path).read_bytes()).hexdigest()  # type: ignore[arg-type]
+        except (OSError, TypeError):
+            digest = None
+        _module_hashes[name] = digest
+    return _module_hashes[name]
+
+
+def forget_fingerprint(module: ModuleType | str) -> None:
+    """
+    drops the stored hash of module, so a reloaded source is hashed again.
+    """
+    _module_hashes.pop(module_name(module), None)
@@ -0,0 +1,331 @@
+import threading
+import weakref
+from array import array
+from collections.abc import Iterable
+from typing import Any
+
+from paramsight._mro_resolver import (
+    _AmbiguousSourcesError,
+    _bases_with_origins,
+    _same_value,
+)
+from paramsight._plan import PlanEntry, ResolutionPlan
+from paramsight._reachability import reachability_index
+from paramsight.type_utils import (
+    TypeVar,
+    _get_typevar_default,
+    _is_typevar,
+    get_args_robust,
+    get_parameters,
+)
+
+# arg_source codes, for values that are not an index into the subclass's params
+_UNBOUND = -1  # a bare base: the base's typevar default / bound
+_CONST = -2  # fixed value, stored at constants[_CONST - code]
+
+# source kinds while compiling
+_ARG = 0
+_FIXED = 1
+_TYPEVAR = 2
+
+
+class FlatHierarchy:
+    """
+    compact, index based representation of the generic class hierarchy.
+
+    classes get integer ids, and every type parameter of every class gets a
+    global slot id. the edges are stored CSR-style in array('i') buffers:
+
+    - slot_offsets[c] : slot_offsets[c + 1] are the slots of class c
+    - base_offsets[c] : base_offsets[c + 1] are the base edges of class c
+    - base_class[e] is the class id of the origin of base edge e
+    - arg_offsets[e] : arg_offsets[e + 1] index arg_source, one entry per type
+      parameter of the base: the index of the subclass parameter passed
+      through, _UNBOUND, or a fixed constant
+
+    classes are registered with their ancestors on first use and are held
+    weakly. rows are append only, so the row of a collected class, and the
+    typevars and fixed values it holds, stay until more than half of the rows
+    are dead. the next compile then drops every row, and the live classes
+    register again as they are used. until then the buffers can pin as many
+    fixed values of collected classes as there are live rows. clear() drops
+    them right away.
+
+    the TypeNode graph in _paramsight stays the readable view of the same
+    hierarchy. registration and everything reading the buffers hold the lock;
+    looking up the id of a registered class does not.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids: weakref.WeakKeyDictionary[type, int] = weakref.WeakKeyDictionary()
+        self._classes: list[weakref.ref[type]] = []
+        self._dead = 0
+        self.typevars: list[TypeVar] = []
+        self.constants: list[Any] = []
+        self.slot_offsets = array("i", [0])
+        self.base_offsets = array("i", [0])
+        self.base_class = array("i")
+        self.arg_offsets = array("i", [0])
+        self.arg_source = array("i")
+
+    def _on_collect(self, _: weakref.ref[type]) -> None:
+        # runs during gc, possibly while this thread holds the lock, so it
+        # only counts. the rows are dropped by the next compile
+        self._dead += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(classes={len(self)},"
+            f" slots={len(self.typevars)}, edges={len(self.base_class)})"
+        )
+
+    def class_id(self, cls: type) -> int:
+        cid = self._ids.get(cls)
+        if cid is not None:
+            return cid
+        with self._lock:
+            return self._register(cls)
+
+    def _register(self, cls: type) -> int:
+        # register bases before the classes that refer to them, iteratively
+        stack = [cls]
+        while stack:
+            top = stack[-1]
+            if top in self._ids:
+                stack.pop()
+                continue
+            missing = [
+                base_origin
+                for _, _, base_origin in _bases_with_origins(top)
+                if base_origin not in self._ids
+            ]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            self._append(top)
+        return self._ids[cls]
+
+    def _append(self, cls: type) -> None:
+        # everything is computed before the buffers are touched, so a class
+        # that fails to register leaves them consistent
+        params = get_parameters(cls)
+        base_ids = []
+        arg_codes: list[list[int]] = []
+        constants = []
+        for _, base, base_origin in _bases_with_origins(cls):
+            bid = self._ids[base_origin]
+            args = get_args_robust(base)
+            codes = []
+            for j in range(self.slot_offsets[bid + 1] - self.slot_offsets[bid]):
+                arg = args[j] if j < len(args) else None
+                if arg is None:
+                    code = _UNBOUND
+                else:
+                    code = next(
+                        (i for i, param in enumerate(params) if arg is param), None
+                    )
+                    if code is None:
+                        code = _CONST - len(self.constants) - len(constants)
+                        constants.append(arg)
+                codes.append(code)
+            base_ids.append(bid)
+            arg_codes.append(codes)
+
+        cid = len(self._classes)
+        self._classes.append(weakref.ref(cls, self._on_collect))
+        self.typevars.extend(params)
+        self.constants.extend(constants)
+        self.slot_offsets.append(self.slot_offsets[cid] + len(params))
+        for bid, codes in zip(base_ids, arg_codes, strict=True):
+            self.base_class.append(bid)
+            self.arg_source.extend(codes)
+            self.arg_offsets.append(len(self.arg_source))
+        self.base_offsets.append(len(self.base_class))
+        self._ids[cls] = cid
+
+    def _edge_ranks(self, oid: int, relevant: bytearray) -> dict[int, int]:
+        # same preorder as _mro_resolver._edge_ranks, over edge ids
+        ranks: dict[int, int] = {}
+        visited = {oid}
+        stack = [(oid, self.base_offsets[oid])]
+        while stack:
+            cid, e = stack[-1]
+            if e == self.base_offsets[cid + 1]:
+                stack.pop()
+                continue
+            stack[-1] = (cid, e + 1)
+            bid = self.base_class[e]
+            if not relevant[bid]:
+                continue
+            ranks[e] = len(ranks) + 1
+            if bid not in visited:
+                visited.add(bid)
+                stack.append((bid, self.base_offsets[bid]))
+        return ranks
+
+    def compile_plans(
+        self,
+        origin: type,
+        target_bases: Iterable[type],
+        return_bound_as_fallback: bool = False,
+    ) -> dict[type, ResolutionPlan]:
+        """
+        compiles plans with the same propagation as compile_plans_mro, but
+        walking the arrays instead of the classes' bases. raises
+        _AmbiguousSourcesError in the same cases.
+        """
+        with self._lock:
+            return self._compile_plans(origin, target_bases, return_bound_as_fallback)
+
+    def _compile_plans(
+        self,
+        origin: type,
+        target_bases: Iterable[type],
+        return_bound_as_fallback: bool,
+    ) -> dict[type, ResolutionPlan]:
+        if self._dead * 2 > len(self._classes):
+            self._reset()
+        oid = self.class_id(origin)
+        targets = list(dict.fromkeys(target_bases))
+        relevant = bytearray(len(self._classes))
+        mro_ids = []
+        for mro_pos, cls in enumerate(origin.__mro__):
+            cid = self._ids.get(cls)
+            if cid is None:
+                continue
+            mro_ids.append((mro_pos, cid))
+            relevant[cid] = reachability_index.reaches_any(cls, targets)
+        target_ids = {t: self._ids.get(t) for t in targets}
+
+        ranks = self._edge_ranks(oid, relevant)
+        typevars, offsets = self.typevars, self.slot_offsets
+        # slot id -> (rank, index at rank, kind, payload, default, bound). for
+        # fixed values the default field holds the mro position of the class
+        # whose base alias fixes it
+        sources: dict[int, tuple] = {
+            offsets[oid] + i: (0, i, _ARG, i, _get_typevar_default(tv), tv.__bound__)
+            for i, tv in enumerate(typevars[offsets[oid] : offsets[oid + 1]])
+        }
+        reached = {oid}
+        pending = {tid for tid in target_ids.values() if tid is not None}
+        for mro_pos, cid in mro_ids:
+            if not pending:
+                break
+            if cid not in reached:
+                continue
+            pending.discard(cid)
+            for e in range(self.base_offsets[cid], self.base_offsets[cid + 1]):
+                rank = ranks.get(e)
+                if rank is None:
+                    continue
+                bid = self.base_class[e]
+                reached.add(bid)
+                base_slot = offsets[bid]
+                for j, k in enumerate(
+                    range(self.arg_offsets[e], self.arg_offsets[e + 1])
+                ):
+                    code = self.arg_source[k]
+                    dst = base_slot + j
+                    if code >= 0:
+                        src = sources[offsets[cid] + code]
+                        bound = typevars[dst].__bound__
+                        if not src[5] and bound:
+                            src = (*src[:5], bound)
+                    elif code == _UNBOUND:
+                        tv = typevars[dst]
+                        src = (
+                            rank,
+                            j,
+                            _TYPEVAR,
+                            dst,
+                            _get_typevar_default(tv),
+                            tv.__bound__,
+                        )
+                    else:
+                        src = (rank, j, _FIXED, _CONST - code, mro_pos, None)
+                    current = sources.get(dst)
+                    if current is None:
+                        sources[dst] = src
+                    elif src[:2] != current[:2] and not (
+                        src[2] == current[2] == _FIXED
+                        and _same_value(
+                            self.constants[src[3]], self.constants[current[3]]
+                        )
+                    ):
+                        raise _AmbiguousSourcesError(self._classes[bid](), j)
+                    elif src[:2] < current[:2]:
+                        sources[dst] = src
+
+        plans = {}
+        for target_base, tid in target_ids.items():
+            num_tv_in_tgt = len(get_parameters(target_base))
+            target_sources = (
+                []
+                if tid is None or tid not in reached
+                else [sources.get(offsets[tid] + j) for j in range(num_tv_in_tgt)]
+            )
+            found = [src for src in target_sources if src is not None]
+            if len(found) != num_tv_in_tgt:
+                raise ValueError(
+                    f"failed to locate all typevars for base {target_base}.\n"
+                    f"found {len(found)} typevars, expected {num_tv_in_tgt}"
+                )
+            plans[target_base] = ResolutionPlan(
+                target_base=target_base,
+                entries=tuple(
+                    self._plan_entry(src, return_bound_as_fallback) for src in found
+                ),
+                return_bound_as_fallback=return_bound_as_fallback,
+            )
+        return plans
+
+    def _plan_entry(self, src: tuple, return_bound_as_fallback: bool) -> PlanEntry:
+        _, _, kind, payload, default, bound = src
+        if kind == _FIXED:
+            value = self.constants[payload]
+            if _is_typevar(value):
+                return PlanEntry("default", _get_typevar_default(value))
+            return PlanEntry("fixed", value, fixed_at=default)
+        arg_index = payload if kind == _ARG else None
+        if default:
+            return PlanEntry("default", default, arg_index)
+        if return_bound_as_fallback and bound:
+            return PlanEntry("bound", bound, arg_index)
+        return PlanEntry("none", None, arg_index)
+
+    def pretty_print(self, cls: type) -> None:
+        with self._lock:
+            self._pretty_print(cls)
+
+    def _pretty_print(self, cls: type) -> None:
+        cid = self.class_id(cls)
+        offsets = self.slot_offsets
+        print(f"{cls} (id {cid})")
+        print("  slots:", self.typevars[offsets[cid] : offsets[cid + 1]])
+        for e in range(self.base_offsets[cid], self.base_offsets[cid + 1]):
+            bid = self.base_class[e]
+            args = []
+            for k in range(self.arg_offsets[e], self.arg_offsets[e + 1]):
+                code = self.arg_source[k]
+                if code >= 0:
+                    args.append(self.typevars[offsets[cid] + code])
+                elif code == _UNBOUND:
+                    args.append("<unbound>")
+                else:
+                    args.append(self.constants[_CONST - code])
+            print(f"  base {self._classes[bid]()} (id {bid}): {args}")
+
+
+flat_hierarchy = FlatHierarchy()
@@ -0,0 +1,196 @@
+import typing
+from collections.abc import Iterable, Iterator
+from types import get_original_bases
+from typing import Any
+
+from attrs import define, evolve
+
+from paramsight._plan import PlanEntry, ResolutionPlan
+from paramsight._reachability import reachability_index
+from paramsight.type_utils import (
+    _get_typevar_default,
+    _is_typevar,
+    get_args_robust,
+    get_origin_robust,
+    get_parameters,
+    is_generic_alias,
+)
+
+
+@define(frozen=True)
+class _Source:
+    """
+    where the value of one type parameter comes from while substitution maps
+    are propagated down the mro.
+
+    rank orders sources the way the graph engine's depth first search would
+    find them: (preorder of the base alias the value originates at, index of
+    the parameter there). the origin's own parameters rank (0, i). fixed_at
+    is the mro position of the class whose base alias fixes a fixed value.
+    """
+
+    rank: tuple[int, int]
+    arg_index: int | None = None
+    fixed: bool = False
+    value: Any = None
+    default: Any = None
+    bound: Any = None
+    fixed_at: int | None = None
+
+    def to_plan_entry(self, return_bound_as_fallback: bool) -> PlanEntry:
+        if self.fixed:
+            if _is_typevar(self.value):
+                return PlanEntry("default", _get_typevar_default(self.value))
+            return PlanEntry("fixed", self.value, fixed_at=self.fixed_at)
+        if self.default:
+            return PlanEntry("default", self.default, self.arg_index)
+        if return_bound_as_fallback and self.bound:
+            return PlanEntry("bound", self.bound, self.arg_index)
+        return PlanEntry("none", None, self.arg_index)
+
+
+class _AmbiguousSourcesError(Exception):
+    """
+    raised when different sources reach the same parameter. whether they
+    conflict depends on which paths an alias's own parameters override,
+    which propagating down the mro doesn't track, so the caller compiles
+    these plans with the graph search instead.
+    """
+
+
+def _same_value(a: Any, b: Any) -> bool:
+    return a is b or a == b
+
+
+def _base_origin(base: Any) -> type:
+    if is_generic_alias(base):
+        origin = get_origin_robust(base)
+        assert isinstance(origin, type)
+        return origin
+    assert isinstance(base, type)
+    return base
+
+
+def _bases_with_origins(cls: type) -> Iterator[tuple[int, Any, type]]:
+    for pos, base in enumerate(get_original_bases(cls)):
+        origin = _base_origin(base)
+        if origin is not typing.Generic:
+            yield pos, base, origin
+
+
+def _edge_ranks(origin: type, relevant: Any) -> dict[tuple[type, int], int]:
+    # iterative dfs over (class, base position) edges, numbered in the
+    # preorder the recursive graph search visits base aliases in.
+    ranks: dict[tuple[type, int], int] = {}
+    visited = {origin}
+    stack = [(origin, _bases_with_origins(origin))]
+    while stack:
+        cls, bases = stack[-1]
+        nxt = next(bases, None)
+        if nxt is None:
+            stack.pop()
+            continue
+        pos, _, base_origin = nxt
+        if not relevant(base_origin):
+            continue
+        ranks[(cls, pos)] = len(ranks) + 1
+        if base_origin not in visited:
+            visited.add(base_origin)
+            stack.append((base_origin, _bases_with_origins(base_origin)))
+    return ranks
+
+
+def compile_plans_mro(
+    origin: type, target_bases: Iterable[type], return_bound_as_fallback: bool = False
+) -> dict[type, ResolutionPlan]:
+    """
+    compiles plans by walking origin.__mro__ once, propagating each class's
+    parameter sources to its bases. since a class precedes all of its bases in
+    the mro, a target's sources are final once it is reached, and the walk
+    stops when every target has been reached. gives the same plans as
+    GenericAliasNode.compile_plans without recursion or trace paths, and
+    raises _AmbiguousSourcesError where two sources of a parameter disagree.
+    """
+    targets = list(dict.fromkeys(target_bases))
+    ranks = _edge_ranks(
+        origin, lambda cls: reachability_index.reaches_any(cls, targets)
+    )
+    sources: dict[type, list[_Source | None]] = {
+        origin: [
+            _Source(
+                rank=(0, i),
+                arg_index=i,
+                default=_get_typevar_default(tv),
+                bound=tv.__bound__,
+            )
+            for i, tv in enumerate(get_parameters(origin))
+        ]
+    }
+    pending = set(targets)
+    for mro_pos, cls in enumerate(origin.__mro__):
+        if not pending:
+            break
+        cls_sources = sources.get(cls)
+        if cls_sources is None:
+            continue
+        pending.discard(cls)
+        params = get_parameters(cls)
+        for pos, base, base_origin in _bases_with_origins(cls):
+            rank = ranks.get((cls, pos))
+            if rank is None:
+                continue
+            args = get_args_robust(base)
+            base_params = get_parameters(base_origin)
+            dst = sources.setdefault(base_origin, [None] * len(base_params))
+            for j, tv in enumerate(base_params):
+                arg = args[j] if j < len(args) else None
+                src = None
+                if arg is not None:
+                    for i, param in enumerate(params):
+                        if arg is param:
+                            src = cls_sources[i]
+                            assert src is not None
+                            if not src.bound and tv.__bound__:
+                                src = evolve(src, bound=tv.__bound__)
+                            break
+                    else:
+                        src = _Source(
+                            rank=(rank, j), fixed=True, value=arg, fixed_at=mro_pos
+                        )
+                else:
+                    src = _Source(
+                        rank=(rank, j),
+                        default=_get_typevar_default(tv),
+                        bound=tv.__bound__,
+                    )
+                current = dst[j]
+                if current is None:
+                    dst[j] = src
+                elif src.rank != current.rank and not (
+                    src.fixed
+                    and current.fixed
+                    and _same_value(src.value, current.value)
+                ):
+                    raise _AmbiguousSourcesError(base_origin, j)
+                elif src.rank < current.rank:
+                    dst[j] = src
+
+    plans = {}
+    for target_base in targets:
+        target_sources = [
+            src for src in sources.get(target_base, ()) if src is not None
+        ]
+        num_tv_in_tgt = len(get_parameters(target_base))
+        if len(target_sources) != num_tv_in_tgt:
+            raise ValueError(
+                f"failed to locate all typevars for base {target_base}.\n"
+                f"found {len(target_sources)} typevars, expected {num_tv_in_tgt}"
+            )
+        plans[target_base] = ResolutionPlan(
+            target_base=target_base,
+            entries=tuple(
+                src.to_plan_entry(return_bound_as_fallback) for src in target_sources
+            ),
+            return_bound_as_fallback=return_bound_as_fallback,
+        )
+    return plans
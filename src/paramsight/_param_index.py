@@ -0,0 +1,109 @@
+import threading
+import weakref
+from collections import deque
+from collections.abc import Iterable
+from typing import Any
+
+from paramsight._dispatch import _matches, _params_for
+from paramsight._paramsight import try_resolve
+from paramsight.aliasclassmethod import _add_subclass_hook
+
+
+def _without_rebuilt(classes: Iterable[type]) -> list[type]:
+    """
+    classes, in order, keeping only the latest of those sharing a module,
+    qualname and bases. the key is read here rather than as classes are
+    added, as dataclass(slots=True) sets the qualname of the class it builds
+    after the class is created.
+    """
+    latest: dict[tuple[str, str, tuple[type, ...]], type] = {}
+    for cls in classes:
+        latest[cls.__module__, cls.__qualname__, cls.__bases__] = cls
+    return list(latest.values())
+
+
+class ParamIndex:
+    """
+    the subclasses of base, indexed by the type parameters they resolve to on
+    base. existing subclasses are indexed on construction, and new ones as
+    they are created, through the patched __init_subclass__ (installing it on
+    base, as takes_alias does). pydantic models aren't patched, so
+    subclasses of a pydantic base created later are only picked up by
+    refresh().
+
+    classes are held weakly. classes whose parameters can't be located, or
+    are unhashable, are not indexed. parameters are indexed with nested
+    typevars substituted, eg. (list[int],) for a subclass of
+    `class Mid[U](Base[list[U]])` fixing U to int. a class created with the
+    module, qualname and bases of an indexed one replaces it, since
+    decorators like attrs' @define or dataclass(slots=True) build a new class
+    from the one they decorate, which lives on until it is collected.
+    """
+
+    def __init__(self, base: type):
+        self.base = base
+        # each value is an ordered weak set of the classes with those params
+        self._by_params: dict[
+            tuple[Any, ...], weakref.WeakKeyDictionary[type, None]
+        ] = {}
+        self._lock = threading.Lock()
+        _add_subclass_hook(base, self._add)
+        self.refresh()
+
+    def _add(self, cls: type) -> None:
+        params = try_resolve(cls, self.base, substitute_nested=True)
+        if params is None:
+            return
+        try:
+            with self._lock:
+                classes = self._by_params.setdefault(
+                    params, weakref.WeakKeyDictionary()
+                )
+                classes[cls] = None
+        except TypeError:  # unhashable params, eg. Annotated metadata
+            return
+
+    def refresh(self) -> None:
+        """
+        indexes every current subclass of base, walking __subclasses__.
+        """
+        # breadth first, so a class rebuilt from a sibling is added after it
+        queue = deque(type.__subclasses__(self.base))
+        seen: set[type] = set()
+        while queue:
+            cls = queue.popleft()
+            if cls in seen:
+                continue
+            seen.add(cls)
+            self._add(cls)
+            queue.extend(type.__subclasses__(cls))
+
+    def exact(self, *params: Any) -> list[type]:
+        """
+        the subclasses whose parameters are exactly params, given as an alias
+        of base (`Handler[Event]`) or as the parameters themselves.
+        """
+        classes = self._by_params.get(_params_for(self.base, params))
+        return [] if classes is None else _without_rebuilt(list(classes.keys()))
+
+    def matching(self, *params: Any) -> list[type]:
+        """
+        the subclasses whose parameters are params or, where a param is a
+        class, a subclass or alias of one. looks at each distinct parameter
+        tuple once rather than at each class.
+        """
+        query = _params_for(self.base, params)
+        with self._lock:
+            groups = list(self._by_params.items())
+        return [
+            cls
+            for resolved, classes in groups
+            if all(_matches(q, r) for q, r in zip(query, resolved, strict=True))
+            for cls in _without_rebuilt(list(classes.keys()))
+        ]
+
+    def __len__(self) -> int:
+        return sum(
+            len(_without_rebuilt(list(classes.keys())))
+            for classes in list(self._by_params.values())
+        )
@@ -0,0 +1,120 @@
+import typing
+from types import GenericAlias
+
+from paramsight._paramsight import (
+    get_resolution_plans,
+    get_resolved_typevars_for_base,
+)
+from paramsight._plan import PARAM_TABLE_ATTR, ResolutionPlan
+from paramsight.type_utils import (
+    _is_pydantic,
+    get_parameters,
+    is_generic_alias,
+    specialization_key,
+)
+
+_EAGER_ATTR = "__paramsight_eager__"
+
+
+def _generic_ancestors(cls: type) -> list[type]:
+    ancestors = []
+    for base in cls.__mro__:
+        if base is typing.Generic or is_generic_alias(base):
+            continue
+        try:
+            if get_parameters(base):
+                ancestors.append(base)
+        except ValueError:
+            continue
+    return ancestors
+
+
+def build_param_table(
+    cls: type, return_bound_as_fallback: bool = False
+) -> dict[type, ResolutionPlan]:
+    """
+    compiles the plans from cls to each of its generic ancestors (including
+    cls itself) in one traversal.
+    """
+    ancestors = _generic_ancestors(cls)
+    try:
+        return get_resolution_plans(cls, ancestors, return_bound_as_fallback)
+    except ValueError:
+        # an ancestor whose parameters can't all be located; keep the rest
+        table = {}
+        for ancestor in ancestors:
+            try:
+                table |= get_resolution_plans(
+                    cls, (ancestor,), return_bound_as_fallback
+                )
+            except ValueError:
+                continue
+        return table
+
+
+def get_parameter_map(
+    cls: type | GenericAlias,
+    return_bound_as_fallback: bool = False,
+    substitute_nested: bool = False,
+) -> dict[type, tuple[type | GenericAlias | None, ...]]:
+    """
+    maps every generic ancestor of cls (including its origin) to its resolved
+    type parameters, in mro order. the plans are compiled in one traversal,
+    or read from the class's table if it has one. with substitute_nested,
+    typevars inside values fixed by intermediate bases are substituted as in
+    get_resolved_typevars_for_base, eg. (list[str],) rather than (list[U],)
+    for M with `class Sub[U](M[list[U]])` and Sub[str].
+    """
+    origin, args = specialization_key(cls)
+    table = build_param_table(origin, return_bound_as_fallback)
+    if substitute_nested:
+        return {
+            ancestor: get_resolved_typevars_for_base(
+                cls, ancestor, return_bound_as_fallback, substitute_nested=True
+            )
+            for ancestor in table
+        }
+    return {ancestor: plan.apply(args) for ancestor, plan in table.items()}
+
+
+def _attach_param_table(cls: type) -> None:
+    if is_generic_alias(cls):
+        return
+    setattr(cls, PARAM_TABLE_ATTR, build_param_table(cls))
+
+
+def _make_table_init_subclass(owner: type, hook_name: str):
+    own_hook = owner.__dict__.get(hook_name)
+
+    def _table_init_subclass(cls, **kw):
+        if own_hook is not None:
+            own_hook.__get__(None, cls)(**kw)
+        else:
+            getattr(super(owner, cls), hook_name)(**kw)
+        _attach_param_table(cls)
+
+    return _table_init_subclass
+
+
+def precompute_params[C: type](cls: C) -> C:
+    """
+    class decorator that attaches the resolution plans for every generic
+    ancestor to cls as __paramsight_table__ when the class is defined, and
+    does the same for every subclass of it. resolution against a class with a
+    table is a dict lookup and a gather over the alias's args.
+    """
+    if getattr(cls, _EAGER_ATTR, False):
+        _attach_param_table(cls)
+        return cls
+    # pydantic models only have their generic metadata once fully built
+    hook_name = (
+        "__pydantic_init_subclass__" if _is_pydantic(cls) else "__init_subclass__"
+    )
+    setattr(
+        cls,
+        hook_name,
+        classmethod(_make_table_init_subclass(cls, hook_name)),
+    )
+    setattr(cls, _EAGER_ATTR, True)
+    _attach_param_table(cls)
+    return cls
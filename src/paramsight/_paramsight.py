@@ -1,9 +1,22 @@
+import inspect
+import threading
 import typing
-from types import GenericAlias, get_original_bases
+import weakref
+from collections.abc import Callable, Iterable
+from types import GenericAlias, ModuleType, get_original_bases
 from typing import Any, Self, get_origin
 
 from attrs import define, field
 
+from paramsight._alias_cache import subalias_cache, type_hints_cache, variant_cache
+from paramsight._class_versions import module_name
+from paramsight._fingerprint import forget_fingerprint
+from paramsight._flat_graph import flat_hierarchy
+from paramsight._mro_resolver import _AmbiguousSourcesError, compile_plans_mro
+from paramsight._plan import PlanEntry, ResolutionPlan, plan_cache
+from paramsight._reachability import reachability_index
+from paramsight._resolution_cache import resolution_cache
+from paramsight._substitution import free_typevars, substitution_cache
 from paramsight.type_utils import (
     TypeVar,
     _assert_is_instance,
@@ -14,6 +27,9 @@ from paramsight.type_utils import (
     get_origin_robust,
     get_parameters,
     is_generic_alias,
+    specialization_key,
+    typed_args,
+    unwrap_annotated,
 )
 
 
@@ -22,14 +38,32 @@ class TypeVarTracePath:
     root: "GenericAliasNode"
     root_typevar_idx: int
     typevar_chain_path: tuple[int, ...] = field(factory=tuple)
+    # the class whose bases contain root, None for the top alias
+    root_parent: "TypeNode | None" = None
 
     def add_link(self, link_idx: int) -> Self:
         return self.__class__(
             root=self.root,
             root_typevar_idx=self.root_typevar_idx,
             typevar_chain_path=self.typevar_chain_path + (link_idx,),
+            root_parent=self.root_parent,
         )
 
+    def same_source(self, other: "TypeVarTracePath") -> bool:
+        """
+        whether both paths resolve alike: they start at the same parameter of
+        the same alias, or their aliases fix equal values.
+        """
+        if self.root is other.root and self.root_typevar_idx == other.root_typevar_idx:
+            return True
+        arg, other_arg = self._root_arg(), other._root_arg()
+        return arg is not None and other_arg is not None and arg == other_arg
+
+    def _root_arg(self) -> Any:
+        if self.root.ga:
+            return get_args_robust(self.root.ga)[self.root_typevar_idx]
+        return None
+
     def get_typevar_sequence(self) -> list["TypeVarNode"]:
         node = self.root.orig.typevars[self.root_typevar_idx]
         nodes = [node]
@@ -57,20 +91,90 @@ class TypeVarTracePath:
                     return node.bound
         return None
 
+    def to_plan_entry(
+        self, top: "GenericAliasNode", return_bound_as_fallback: bool = False
+    ) -> PlanEntry:
+        """
+        the same lookup as resolve_to_value, but with args of the top alias
+        left as a reference so the entry can be applied to any of its args
+        """
+        if self.root.ga:
+            arg = get_args_robust(self.root.ga)[self.root_typevar_idx]
+            if arg is not None:
+                if _is_typevar(arg):
+                    return PlanEntry("default", _get_typevar_default(arg))
+                return PlanEntry(
+                    "fixed",
+                    arg,
+                    fixed_at=None
+                    if self.root_parent is None
+                    else top.origin.__mro__.index(self.root_parent.cls),
+                )
+        arg_index = self.root_typevar_idx if self.root is top else None
+        nodes = self.get_typevar_sequence()
+        if nodes[0].default:
+            return PlanEntry("default", nodes[0].default, arg_index)
+        if return_bound_as_fallback:
+            for node in nodes:
+                if node.bound:
+                    return PlanEntry("bound", node.bound, arg_index)
+        return PlanEntry("none", None, arg_index)
+
+
+@define
+class _Conflict:
+    """
+    paths from different sources to the same target parameter, none of them
+    found before the others. an alias whose own parameters reach the
+    parameter overrides it, otherwise compiling the plan raises.
+    """
+
+    paths: tuple[TypeVarTracePath, ...]
+
+
+def _merge_path(
+    current: "TypeVarTracePath | _Conflict | None",
+    path: "TypeVarTracePath | _Conflict",
+) -> "TypeVarTracePath | _Conflict":
+    # the first path is kept when both lead to the same source
+    if current is None:
+        return path
+    if isinstance(current, TypeVarTracePath) and isinstance(path, TypeVarTracePath):
+        if current.same_source(path):
+            return current
+    return _Conflict(
+        tuple(
+            p
+            for c in (current, path)
+            for p in (c.paths if isinstance(c, _Conflict) else (c,))
+        )
+    )
+
 
 @define
 class TypeVarNode:
+    """
+    a type parameter of the class of its home node. home is held weakly:
+    the home node holds its typevars, and a strong link back would make
+    every node a cycle that only the cyclic gc can free. links to typevars
+    of bases point down the hierarchy, so the graph stays acyclic.
+    """
+
     typevar: TypeVar
     default: type | None
-    home: "TypeNode"
+    home_ref: "weakref.ref[TypeNode]"
     home_idx: int
-    chains_to: list["TypeVarNode"]
     bound: type | GenericAlias | None
+    _chains_to: list["TypeVarNode"] | None = None
+
+    @property
+    def home(self) -> "TypeNode":
+        home = self.home_ref()
+        assert home is not None
+        return home
 
     @classmethod
     def make_nodes(cls, typenode: "TypeNode") -> list[Self]:
-        assert not typenode.typevars
-        tv_edges = _get_typevar_subst_edges_list(typenode.cls)
         type_params: list[TypeVar] = [
             _assert_is_instance(tv, TypeVar) for tv in get_parameters(typenode.cls)
         ]
@@ -79,21 +183,26 @@ class TypeVarNode:
             cls(
                 typevar=tv,
                 default=_get_typevar_default(tv),
-                home=typenode,
+                home_ref=weakref.ref(typenode),
                 home_idx=i,
-                chains_to=[
-                    base.orig.typevars[tv_edge_dst]
-                    for base, base_tv_edges in zip(
-                        typenode.bases, tv_edges, strict=True
-                    )
-                    for tv_edge_src, tv_edge_dst in base_tv_edges
-                    if tv_edge_src == i and base.orig.cls is not typing.Generic
-                ],
                 bound=tv.__bound__,
             )
             for i, tv in enumerate(type_params)
         ]
 
+    @property
+    def chains_to(self) -> list["TypeVarNode"]:
+        if self._chains_to is None:
+            self._chains_to = [
+                base.orig.typevars[tv_edge_dst]
+                for base, base_tv_edges in zip(
+                    self.home.bases, self.home.subst_edges, strict=True
+                )
+                for tv_edge_src, tv_edge_dst in base_tv_edges
+                if tv_edge_src == self.home_idx and base.origin is not typing.Generic
+            ]
+        return self._chains_to
+
     def pretty_print(self, indent: int = 0):
         print(" " * indent, f"{self.typevar}")
         print(" " * indent, f"default: {self.default}")
@@ -109,41 +218,105 @@ class TypeVarNode:
         return f"TypeVarNode<{self.typevar!r}{boundstr}{defaultstr}>"
 
     def find_type(
-        self, target_type: type, path: TypeVarTracePath
+        self,
+        target_type: type,
+        path: TypeVarTracePath,
+        memo: dict[int, Any] | None = None,
     ) -> dict[int, TypeVarTracePath]:
-        if self.home.cls is target_type:
-            return {self.home_idx: path}
+        return {
+            k: TypeVarTracePath(
+                root=path.root,
+                root_typevar_idx=path.root_typevar_idx,
+                typevar_chain_path=path.typevar_chain_path + chain,
+                root_parent=path.root_parent,
+            )
+            for (_, k), chain in self._find_chains(
+                frozenset((target_type,)), {} if memo is None else memo
+            ).items()
+        }
+
+    def _find_chains(
+        self, targets: frozenset[type], memo: dict[int, Any]
+    ) -> dict[tuple[type, int], tuple[int, ...]]:
+        # nodes are shared between every path that reaches them, so the chains
+        # found below a node are computed once per search. when a diamond
+        # reaches the same target slot along several chains, the first one in
+        # chains_to order is kept.
+        found = memo.get(id(self))
+        if found is not None:
+            return found
         found = {}
-        for i, tgt in enumerate(self.chains_to):
-            result = tgt.find_type(target_type, path.add_link(i))
-            if result.keys() & found.keys():
-                raise ValueError(
-                    f"duplicated paths found? result = {result}, found = {found}"
-                )
-            found.update(result)
+        home = self.home.cls
+        if home in targets:
+            found[(home, self.home_idx)] = ()
+        if home not in targets or len(targets) > 1:
+            for i, tgt in enumerate(self.chains_to):
+                if not _reaches_any(tgt.home.cls, targets):
+                    continue
+                for k, chain in tgt._find_chains(targets, memo).items():
+                    if k not in found:
+                        found[k] = (i, *chain)
+        memo[id(self)] = found
         return found
 
 
 @define
 class TypeNode:
-    cls: type
-    bases: list["GenericAliasNode"]
-    # ga_bases: list["GenericAliasNode | TypeNode"]
-    typevars: list[TypeVarNode]
+    """
+    the node for one class. bases, typevars and their edges are built on
+    first access, so a search only materializes the part of the ancestry it
+    walks into. bases and typevars are published once, since searches memoize
+    by node identity.
+    """
+
+    cls_ref: "weakref.ref[type]"
+    _bases: list["GenericAliasNode"] | None = None
+    _typevars: list[TypeVarNode] | None = None
+    _subst_edges: list[list[tuple[int, int]]] | None = None
+
+    @property
+    def cls(self) -> type:
+        t = self.cls_ref()
+        assert t is not None
+        return t
+
+    @property
+    def bases(self) -> list["GenericAliasNode"]:
+        if self._bases is None:
+            bases = [GenericAliasNode.make(b) for b in get_original_bases(self.cls)]
+            with _typenode_lock:
+                if self._bases is None:
+                    self._bases = bases
+        return self._bases
+
+    @property
+    def typevars(self) -> list[TypeVarNode]:
+        if self._typevars is None:
+            typevars = TypeVarNode.make_nodes(self)
+            with _typenode_lock:
+                if self._typevars is None:
+                    self._typevars = typevars
+        return self._typevars
+
+    @property
+    def subst_edges(self) -> list[list[tuple[int, int]]]:
+        if self._subst_edges is None:
+            self._subst_edges = _get_typevar_subst_edges_list(self.cls)
+        return self._subst_edges
 
     @classmethod
-    def make(cls, t: type) -> Self:
-        bases = [GenericAliasNode.make(b) for b in get_original_bases(t)]
-        inst = cls(cls=t, bases=bases, typevars=[])
-        tvs = TypeVarNode.make_nodes(inst)
-        inst.typevars.extend(tvs)
-        # tv_edges = get_typevar_subst_edges_list(t)
-        # for (tv_edge_src, tv_edge_dst), base in zip(tv_edges, bases, strict=True):
-        #     src_tv = inst.typevars[tv_edge_src]
-        #     dst_tv = base.typevars[tv_edge_dst]
-        #     src_tv.chains_to.append(dst_tv)
-
-        return inst
+    def make(cls, t: type) -> "TypeNode":
+        """
+        returns the interned node for t, creating it on first use. the
+        registry holds t weakly.
+        """
+        node = _typenode_registry.get(t)
+        if node is None:
+            with _typenode_lock:
+                node = _typenode_registry.get(t)
+                if node is None:
+                    node = _typenode_registry[t] = cls(cls_ref=weakref.ref(t))
+        return node
 
     def pretty_print(self, indent: int = 0):
         print(" " * indent, f"{self.cls}")
@@ -159,18 +332,25 @@ class TypeNode:
 @define
 class GenericAliasNode:
     ga: GenericAlias | None
-    orig: "TypeNode"
+    origin: type
+    _orig: TypeNode | None = None
+
+    @property
+    def orig(self) -> TypeNode:
+        if self._orig is None:
+            self._orig = TypeNode.make(self.origin)
+        return self._orig
 
     @classmethod
     def make(cls, ga: GenericAlias | type) -> Self:
         if is_generic_alias(ga):
             return cls(
                 ga=ga,
-                orig=TypeNode.make(_assert_is_instance(get_origin_robust(ga), type)),
+                origin=_assert_is_instance(get_origin_robust(ga), type),
             )
         else:
             assert isinstance(ga, type)
-            return cls(ga=None, orig=TypeNode.make(ga))
+            return cls(ga=None, origin=ga)
 
     def pretty_print(self, indent: int = 0):
         print(" " * indent, f"{self.ga}")
@@ -180,64 +360,136 @@ class GenericAliasNode:
         if self.ga:
             return f"GenericAliasNode(ga={self.ga})"
         else:
-            return f"GenericAliasNode(orig={self.orig.cls})"
+            return f"GenericAliasNode(orig={self.origin})"
 
     def find_type(
-        self, target_base: type, found: dict[int, "TypeVarTracePath"] | None = None
-    ) -> dict[int, "TypeVarTracePath"]:
-        found = found or {}
-        num_tv_in_tgt = get_num_typevars(target_base)
+        self,
+        target_base: type,
+        memo: dict[int, Any] | None = None,
+        parent: TypeNode | None = None,
+    ) -> dict[int, "TypeVarTracePath | _Conflict"]:
+        return self.find_types((target_base,), memo, parent)[target_base]
+
+    def find_types(
+        self,
+        target_bases: Iterable[type],
+        memo: dict[int, Any] | None = None,
+        parent: TypeNode | None = None,
+    ) -> dict[type, dict[int, "TypeVarTracePath | _Conflict"]]:
+        """
+        searches for every target base in one traversal. each target gets the
+        same paths a find_type call for it alone would find. parent is the
+        node of the class this alias is a base of. paths from the same source
+        are merged, and a parameter reached from different sources that
+        nothing overrides is left as a _Conflict.
+        """
+        targets = frozenset(target_bases)
+        memo = {} if memo is None else memo
+        found: dict[type, dict[int, TypeVarTracePath | _Conflict]] = {
+            t: {} for t in targets
+        }
+        if not _reaches_any(self.origin, targets):
+            return found
 
-        # found: dict[int, TypeVarTracePath] = {}
         for i, tv in enumerate(self.orig.typevars):
-            result = tv.find_type(
-                target_base,
-                path=TypeVarTracePath(
-                    root=self,
-                    root_typevar_idx=i,
-                ),
-            )
-            if result.keys() & found.keys():
-                raise ValueError(
-                    f"duplicated paths found? result = {result}, found = {found}"
+            for (t, k), chain in tv._find_chains(targets, memo).items():
+                found[t][k] = _merge_path(
+                    found[t].get(k),
+                    TypeVarTracePath(
+                        root=self,
+                        root_typevar_idx=i,
+                        typevar_chain_path=chain,
+                        root_parent=parent,
+                    ),
                 )
-            found.update(result)
 
-        if len(found) < num_tv_in_tgt:
-            res_d: dict[int, TypeVarTracePath] = {}
+        # parameters reached through this alias's own parameters override
+        # whatever its bases find for them
+        pending = [t for t in targets if len(found[t]) < get_num_typevars(t)]
+        if pending:
+            res_d: dict[type, dict[int, TypeVarTracePath | _Conflict]] = {
+                t: {} for t in pending
+            }
             for base in self.orig.bases:
-                result = base.find_type(target_base)
-                rk = result.keys() - found.keys()
-                if rk & res_d.keys():
-                    raise ValueError(
-                        f"duplicated paths found? result = {result},"
-                        " keys = {res_d.keys()}"
+                if not _reaches_any(base.origin, targets):
+                    continue
+                if (result := memo.get(id(base))) is None:
+                    result = memo[id(base)] = base.find_types(
+                        targets, memo=memo, parent=self.orig
                     )
-                for k in rk:
-                    res_d[k] = result[k]
+                for t in pending:
+                    for k in result[t].keys() - found[t].keys():
+                        res_d[t][k] = _merge_path(res_d[t].get(k), result[t][k])
 
-            assert not res_d.keys() & found.keys()
-            found.update(res_d)
+            for t in pending:
+                found[t].update(res_d[t])
         return found
 
+    def find_all(self, target_base: type) -> list["TypeVarTracePath"]:
+        return self.find_all_for((target_base,))[target_base]
+
+    def find_all_for(
+        self, target_bases: Iterable[type]
+    ) -> dict[type, list["TypeVarTracePath"]]:
+        searches = self.find_types(target_bases)
+        paths = {}
+        for target_base, search in searches.items():
+            num_tv_in_tgt = get_num_typevars(target_base)
+            if len(search) != num_tv_in_tgt:
+                raise ValueError(
+                    f"failed to locate all typevars for base {target_base}.\n"
+                    f"found {len(search)} typevars, expected {num_tv_in_tgt}\n"
+                    f"indices found: {search.keys()}"
+                )
+            paths[target_base] = []
+            for i in range(num_tv_in_tgt):
+                path = search[i]
+                if isinstance(path, _Conflict):
+                    raise ValueError(
+                        f"conflicting values for typevar {i} of base {target_base}:"
+                        f" {[p.resolve_to_value() for p in path.paths]}"
+                    )
+                paths[target_base].append(path)
+        return paths
+
     def get_resolved_typevars_for_base(
         self, target_base: type, return_bound_as_fallback: bool = False
     ) -> tuple[type | GenericAlias | None, ...]:
-        num_tv_in_tgt = get_num_typevars(target_base)
-        search = self.find_type(target_base)
-        if len(search) != num_tv_in_tgt:
-            raise ValueError(
-                f"failed to locate all typevars for base {target_base}.\n"
-                f"found {len(search)} typevars, expected {num_tv_in_tgt}\n"
-                f"indices found: {search.keys()}"
-            )
         return tuple(
-            search[i].resolve_to_value(
-                return_bound_as_fallback=return_bound_as_fallback
-            )
-            for i in range(num_tv_in_tgt)
+            path.resolve_to_value(return_bound_as_fallback=return_bound_as_fallback)
+            for path in self.find_all(target_base)
         )
 
+    def compile_plan(
+        self, target_base: type, return_bound_as_fallback: bool = False
+    ) -> ResolutionPlan:
+        return self.compile_plans((target_base,), return_bound_as_fallback)[target_base]
+
+    def compile_plans(
+        self, target_bases: Iterable[type], return_bound_as_fallback: bool = False
+    ) -> dict[type, ResolutionPlan]:
+        return {
+            target_base: ResolutionPlan(
+                target_base=target_base,
+                entries=tuple(
+                    path.to_plan_entry(self, return_bound_as_fallback) for path in paths
+                ),
+                return_bound_as_fallback=return_bound_as_fallback,
+            )
+            for target_base, paths in self.find_all_for(target_bases).items()
+        }
+
+
+def _reaches_any(cls: type, targets: frozenset[type]) -> bool:
+    # only bases that inherit from a target can carry a path to it
+    return reachability_index.reaches_any(cls, targets)
+
+
+_typenode_registry: weakref.WeakKeyDictionary[type, TypeNode] = (
+    weakref.WeakKeyDictionary()
+)
+_typenode_lock = threading.Lock()
+
 
 def _get_typevar_subst_edges_list(cls: type) -> list[list[tuple[int, int]]]:
     if is_generic_alias(cls):
@@ -256,18 +508,372 @@ def _get_typevar_subst_edges_list(cls: type) -> list[list[tuple[int, int]]]:
     ]
 
 
+def _compile_plans_from_graph(
+    origin: type, target_bases: Iterable[type], return_bound_as_fallback: bool = False
+) -> dict[type, ResolutionPlan]:
+    return GenericAliasNode.make(origin).compile_plans(
+        target_bases, return_bound_as_fallback
+    )
+
+
+type PlanCompiler = Callable[[type, Iterable[type], bool], dict[type, ResolutionPlan]]
+
+_engines: dict[str, PlanCompiler] = {
+    "graph": _compile_plans_from_graph,
+    "mro": compile_plans_mro,
+    "flat": flat_hierarchy.compile_plans,
+}
+_engine: PlanCompiler = _compile_plans_from_graph
+
+
+def set_resolution_engine(name: str) -> None:
+    """
+    selects how plans are compiled: "graph" searches the TypeNode graph, "mro"
+    propagates substitution maps down the mro iteratively, and "flat" does the
+    same over the array backed FlatHierarchy. all give the same plans, the
+    latter two handing hierarchies where different sources meet to the graph
+    search; already cached plans are kept.
+    """
+    global _engine
+    try:
+        _engine = _engines[name]
+    except KeyError as e:
+        raise ValueError(
+            f"unknown resolution engine {name!r}, expected one of {list(_engines)}"
+        ) from e
+
+
+def invalidate(module: ModuleType | str) -> None:
+    """
+    drops everything cached about the classes defined in module: resolution
+    results, plans, substitutions, subalias checks, type hints, specialized
+    variants, graph nodes and the source hash snapshot records are checked
+    against. the flat hierarchy can't drop single rows, so it is cleared
+    whole. call it after reloading a module so no result computed from its
+    old classes is handed out.
+    """
+    name = module_name(module)
+    resolution_cache.invalidate(name)
+    plan_cache.invalidate(name)
+    substitution_cache.invalidate(name)
+    subalias_cache.invalidate(name)
+    type_hints_cache.invalidate(name)
+    variant_cache.invalidate(name)
+    forget_fingerprint(name)
+    reachability_index.invalidate(name)
+    flat_hierarchy.clear()
+    with _typenode_lock:
+        for cls in list(_typenode_registry.keys()):
+            if cls.__module__ == name:
+                _typenode_registry.pop(cls, None)
+
+
+def _compile_plans(
+    origin: type, target_bases: Iterable[type], return_bound_as_fallback: bool
+) -> dict[type, ResolutionPlan]:
+    target_bases = list(target_bases)
+    for target_base in target_bases:
+        # fail before any engine walks the hierarchy
+        if not reachability_index.reaches(origin, target_base):
+            raise ValueError(
+                f"failed to locate all typevars for base {target_base}.\n"
+                f"it is not an ancestor of {origin}"
+            )
+    try:
+        return _engine(origin, target_bases, return_bound_as_fallback)
+    except _AmbiguousSourcesError:
+        # only the graph search tells a conflict from an overridden one
+        return _compile_plans_from_graph(origin, target_bases, return_bound_as_fallback)
+
+
+def try_resolve(
+    cls: type | GenericAlias,
+    target_base: type,
+    return_bound_as_fallback: bool = False,
+    substitute_nested: bool = False,
+) -> tuple[type | GenericAlias | None, ...] | None:
+    """
+    get_resolved_typevars_for_base, but returns None instead of raising when
+    the typevars of target_base can't be located from cls. a target_base that
+    is not an ancestor of cls is rejected with a set lookup.
+    """
+    origin, _ = specialization_key(cls)
+    if not reachability_index.reaches(origin, target_base):
+        return None
+    try:
+        return get_resolved_typevars_for_base(
+            cls, target_base, return_bound_as_fallback, substitute_nested
+        )
+    except ValueError:
+        return None
+
+
 def get_resolved_typevars_for_base(
+    cls: type | GenericAlias,
+    target_base: type,
+    return_bound_as_fallback: bool = False,
+    substitute_nested: bool = False,
+) -> tuple[type | GenericAlias | None, ...]:
+    """
+    resolves the type parameters of target_base for cls. with
+    substitute_nested, typevars inside values fixed by intermediate bases
+    (eg. list[U] in `class Mid[U](Base[list[U]])`) are substituted too, so
+    Top[int] resolves Base to (list[int],) rather than (list[U],).
+    """
+
+    def resolve():
+        if substitute_nested:
+            return _resolve_nested(cls, target_base, return_bound_as_fallback)
+        return get_resolution_plan(cls, target_base, return_bound_as_fallback).apply(
+            get_args_robust(cls)
+        )
+
+    return resolution_cache.get_or_resolve(
+        cls, target_base, return_bound_as_fallback, resolve, substitute_nested
+    )
+
+
+def _resolve_nested(
+    cls: type | GenericAlias, target_base: type, return_bound_as_fallback: bool
+) -> tuple[type | GenericAlias | None, ...]:
+    plan = get_resolution_plan(cls, target_base, return_bound_as_fallback)
+    values = plan.apply(get_args_robust(cls))
+    if all(entry.fixed_at is None for entry in plan.entries):
+        return values
+    origin, _ = specialization_key(cls)
+    resolved = []
+    for entry, value in zip(plan.entries, values, strict=True):
+        if entry.fixed_at is not None and free_typevars(value):
+            # the free typevars are parameters of the class the value is
+            # written in, which sits strictly between cls and target_base
+            owner = origin.__mro__[entry.fixed_at]
+            value = substitution_cache.substitute(
+                owner,
+                value,
+                tuple(get_parameters(owner)),
+                _resolve_nested(cls, owner, return_bound_as_fallback),
+            )
+        resolved.append(value)
+    return tuple(resolved)
+
+
+def get_resolution_plan(
     cls: type | GenericAlias, target_base: type, return_bound_as_fallback: bool = False
+) -> ResolutionPlan:
+    """
+    returns the compiled plan mapping args of cls's origin to the type
+    parameters of target_base, compiling it on first use.
+    """
+    origin, _ = specialization_key(cls)
+    plan = plan_cache.get(origin, target_base, return_bound_as_fallback)
+    if plan is None:
+        plan = _compile_plans(origin, (target_base,), return_bound_as_fallback)[
+            target_base
+        ]
+        plan_cache.put(origin, plan)
+    return plan
+
+
+def get_resolution_plans(
+    cls: type | GenericAlias,
+    target_bases: Iterable[type],
+    return_bound_as_fallback: bool = False,
+) -> dict[type, ResolutionPlan]:
+    """
+    get_resolution_plan for several target bases. plans that are not cached
+    yet are compiled together in one traversal of the hierarchy.
+    """
+    origin, _ = specialization_key(cls)
+    target_bases = list(target_bases)
+    plans = {
+        target_base: plan_cache.get(origin, target_base, return_bound_as_fallback)
+        for target_base in target_bases
+    }
+    missing = [target_base for target_base, plan in plans.items() if plan is None]
+    if missing:
+        compiled = _compile_plans(origin, missing, return_bound_as_fallback)
+        for plan in compiled.values():
+            plan_cache.put(origin, plan)
+        plans.update(compiled)
+    return {target_base: plans[target_base] for target_base in target_bases}
+
+
+def get_resolved_typevars_for_bases(
+    cls: type | GenericAlias,
+    target_bases: Iterable[type],
+    return_bound_as_fallback: bool = False,
+) -> dict[type, tuple[type | GenericAlias | None, ...]]:
+    """
+    get_resolved_typevars_for_base for several target bases, sharing a single
+    traversal of the hierarchy.
+    """
+    args = get_args_robust(cls)
+    return {
+        target_base: plan.apply(args)
+        for target_base, plan in get_resolution_plans(
+            cls, target_bases, return_bound_as_fallback
+        ).items()
+    }
+
+
+def resolve_many(
+    aliases: Iterable[type | GenericAlias],
+    target_base: type,
+    return_bound_as_fallback: bool = False,
+) -> list[tuple[type | GenericAlias | None, ...]]:
+    """
+    get_resolved_typevars_for_base for many aliases against one target base.
+    aliases are grouped by origin so each origin's plan is looked up once,
+    and results are returned in input order.
+    """
+    plans: dict[type, ResolutionPlan] = {}
+    resolved = []
+    for alias in aliases:
+        origin, args = specialization_key(alias)
+        plan = plans.get(origin)
+        if plan is None:
+            plan = plans[origin] = get_resolution_plan(
+                origin, target_base, return_bound_as_fallback
+            )
+        resolved.append(plan.apply(args))
+    return resolved
+
+
+def _effective_alias(inst: Any) -> type | GenericAlias:
+    try:
+        return inst.__orig_class__
+    except AttributeError:
+        return inst.__class__
+
+
+def _resolve_alias(
+    cls: type | GenericAlias, target_base: type, return_bound_as_fallback: bool
 ) -> tuple[type | GenericAlias | None, ...]:
-    ga = GenericAliasNode.make(cls)
-    return ga.get_resolved_typevars_for_base(target_base, return_bound_as_fallback)
+    if isinstance(cls, type):
+        return resolution_cache.get_or_resolve_class(
+            cls,
+            target_base,
+            return_bound_as_fallback,
+            lambda: get_resolution_plan(
+                cls, target_base, return_bound_as_fallback
+            ).apply(get_args_robust(cls)),
+        )
+    return get_resolved_typevars_for_base(cls, target_base, return_bound_as_fallback)
 
 
 def get_resolved_typevars_for_base_inst(
     inst: Any, target_base: type, return_bound_as_fallback: bool = False
 ) -> tuple[type | GenericAlias | None, ...]:
-    if hasattr(inst, "__orig_class__"):
-        cls = inst.__orig_class__
-    else:
-        cls = inst.__class__
-    return get_resolved_typevars_for_base(cls, target_base, return_bound_as_fallback)
+    """
+    resolves the typevars of target_base for an instance, using its
+    __orig_class__ when it was created from an alias and its class otherwise.
+    for a plain class the cached result is a lookup on the class itself.
+    """
+    return _resolve_alias(_effective_alias(inst), target_base, return_bound_as_fallback)
+
+
+def resolve_many_inst(
+    instances: Iterable[Any],
+    target_base: type,
+    return_bound_as_fallback: bool = False,
+) -> list[tuple[type | GenericAlias | None, ...]]:
+    """
+    get_resolved_typevars_for_base_inst for many instances against one target
+    base. instances are grouped by their alias, which is resolved once per
+    group, and results are returned in input order.
+    """
+    # keyed by id since aliases need not be hashable; the alias is kept in
+    # the value so its id can't be reused while grouping
+    groups: dict[int, tuple[Any, tuple[type | GenericAlias | None, ...]]] = {}
+    resolved = []
+    for inst in instances:
+        alias = _effective_alias(inst)
+        group = groups.get(id(alias))
+        if group is None:
+            group = groups[id(alias)] = (
+                alias,
+                _resolve_alias(alias, target_base, return_bound_as_fallback),
+            )
+        resolved.append(group[1])
+    return resolved
+
+
+def is_subalias(sub: type | GenericAlias, target: type | GenericAlias) -> bool:
+    """
+    whether sub, a class or alias, specializes target: its origin inherits
+    from target's origin and its typevars resolve to target's args. an arg of
+    target equal to Any matches anything. answers are cached per
+    (sub, target), so checking a hot type again is a dict lookup.
+    """
+    target_origin, target_args = specialization_key(target)
+    return subalias_cache.get_or_compute(
+        sub,
+        (target_origin, typed_args(target_args)),
+        lambda: _is_subalias(sub, target),
+    )
+
+
+def is_instance_of(obj: Any, target: type | GenericAlias) -> bool:
+    """
+    isinstance for specialized aliases, eg. is_instance_of(x, Container[int]).
+    obj is checked through its __orig_class__ when it was created from an
+    alias and through its class otherwise, see is_subalias.
+    """
+    return is_subalias(_effective_alias(obj), target)
+
+
+def _is_subalias(sub: type | GenericAlias, target: type | GenericAlias) -> bool:
+    origin, _ = specialization_key(sub)
+    target_origin, target_args = specialization_key(target)
+    if not reachability_index.reaches(origin, target_origin):
+        return False
+    if not target_args:
+        return True
+    resolved = try_resolve(sub, target_origin, substitute_nested=True)
+    if resolved is None:
+        return False
+    return all(
+        arg is Any or arg == value
+        for arg, value in zip(target_args, resolved, strict=True)
+    )
+
+
+def resolved_type_hints(
+    alias: type | GenericAlias, include_extras: bool = False
+) -> dict[str, Any]:
+    """
+    typing.get_type_hints for a specialized alias: the annotations of every
+    class in the mro, with the type parameters of the class each one is
+    written in substituted by what alias resolves them to (defaults
+    included), eg. {"x1": GbmTest[int, int], ...} for GbmTest2[int].
+    unresolved parameters are left in place. an outer Annotated is unwrapped
+    unless include_extras. cached per alias.
+    """
+    return dict(
+        type_hints_cache.get_or_compute(
+            alias, include_extras, lambda: _resolved_type_hints(alias, include_extras)
+        )
+    )
+
+
+def _resolved_type_hints(
+    alias: type | GenericAlias, include_extras: bool
+) -> dict[str, Any]:
+    origin, _ = specialization_key(alias)
+    hints = typing.get_type_hints(origin, include_extras=True)
+    owners = {}
+    for klass in reversed(origin.__mro__):
+        for name in inspect.get_annotations(klass):
+            owners[name] = klass
+    values: dict[type, tuple[type | GenericAlias | None, ...] | None] = {}
+    resolved = {}
+    for name, hint in hints.items():
+        owner = owners.get(name)
+        params = () if owner is None else tuple(get_parameters(owner))
+        if params and free_typevars(hint):
+            if owner not in values:
+                values[owner] = try_resolve(alias, owner, substitute_nested=True)
+            if values[owner] is not None:
+                hint = substitution_cache.substitute(owner, hint, params, values[owner])
+        resolved[name] = hint if include_extras else unwrap_annotated(hint)
+    return resolved
@@ -0,0 +1,182 @@
+import threading
+import weakref
+from collections.abc import Hashable
+from types import GenericAlias, ModuleType
+from typing import TYPE_CHECKING, Any, Literal
+
+from attrs import define, field
+
+from paramsight._class_versions import (
+    ClassVersions,
+    invalidate_per_class,
+    module_name,
+)
+from paramsight.type_utils import _get_typevar_default, _is_typevar
+
+if TYPE_CHECKING:
+    from paramsight._snapshot import PlanSnapshot
+
+type PlanSource = Literal["fixed", "default", "bound", "none"]
+
+PARAM_TABLE_ATTR = "__paramsight_table__"
+
+
+@define(frozen=True)
+class PlanEntry:
+    """
+    how one type parameter of a target base is obtained from an alias of the
+    origin class.
+
+    if arg_index is set and the alias carries args, the entry takes that arg
+    (substituting the default of a typevar arg). otherwise it uses value,
+    which source describes: fixed by a base alias in the hierarchy, the
+    default or bound of a typevar, or nothing at all.
+
+    fixed_at is, for fixed entries, the position in the origin's __mro__ of
+    the class whose base alias fixes the value. typevars inside the value
+    (eg. the U in list[U]) are parameters of that class.
+    """
+
+    source: PlanSource
+    value: Any = None
+    arg_index: int | None = None
+    fixed_at: int | None = None
+
+    def resolve(self, args: tuple[Any, ...]) -> Any:
+        if self.arg_index is not None and args:
+            arg = args[self.arg_index]
+            if arg is not None:
+                if _is_typevar(arg):
+                    return _get_typevar_default(arg)
+                return arg
+        return self.value
+
+    def __repr__(self):
+        if self.source == "none":
+            fallback = "None"
+        else:
+            fallback = f"{self.source} {self.value!r}"
+        if self.arg_index is None:
+            return f"PlanEntry({fallback})"
+        return f"PlanEntry(arg {self.arg_index}, else {fallback})"
+
+
+@define(frozen=True)
+class ResolutionPlan:
+    """
+    the mapping from an origin class's args to the type parameters of one of
+    its generic bases. it only depends on the class hierarchy, so it is
+    compiled once per (origin, target_base) and applied to any alias of the
+    origin with a tuple gather.
+    """
+
+    target_base: type
+    entries: tuple[PlanEntry, ...]
+    return_bound_as_fallback: bool = False
+
+    def apply(self, args: tuple[Any, ...]) -> tuple[type | GenericAlias | None, ...]:
+        return tuple(entry.resolve(args) for entry in self.entries)
+
+
+@define
+class PlanCache:
+    """
+    compiled plans stored per origin class. the origin is held weakly, and
+    plans never reference it, so caching a plan does not pin the class. the
+    plans of a class are dropped when it is redefined. reads take no lock,
+    writes are serialized.
+
+    with a snapshot in use (see load_snapshot), a class missing from the
+    cache is looked up in it once before its plans are compiled.
+    """
+
+    _plans: weakref.WeakKeyDictionary[type, dict[Hashable, ResolutionPlan]] = field(
+        factory=weakref.WeakKeyDictionary
+    )
+    _versions: ClassVersions = field(factory=ClassVersions)
+    _lock: threading.RLock = field(factory=threading.RLock)
+    _snapshot: "PlanSnapshot | None" = None
+    _snapshot_checked: weakref.WeakSet[type] = field(factory=weakref.WeakSet)
+
+    def get(
+        self, origin: type, target_base: type, return_bound_as_fallback: bool
+    ) -> ResolutionPlan | None:
+        if not return_bound_as_fallback:
+            # tables precomputed at class creation, see precompute_params
+            table = origin.__dict__.get(PARAM_TABLE_ATTR)
+            if table is not None and target_base in table:
+                return table[target_base]
+        per_origin = self._plans.get(origin)
+        plan = (
+            None
+            if per_origin is None
+            else per_origin.get((target_base, return_bound_as_fallback))
+        )
+        if plan is None and not return_bound_as_fallback:
+            plan = self._get_from_snapshot(origin, target_base)
+        return plan
+
+    def _get_from_snapshot(
+        self, origin: type, target_base: type
+    ) -> ResolutionPlan | None:
+        snapshot = self._snapshot
+        if snapshot is None or origin in self._snapshot_checked:
+            return None
+        with self._lock:
+            if origin in self._snapshot_checked:
+                return None
+            self._snapshot_checked.add(origin)
+            table = snapshot.plans_for(origin)
+            if table is None:
+                return None
+            for plan in table.values():
+                self.put(origin, plan)
+        return table.get(target_base)
+
+    def use_snapshot(self, snapshot: "PlanSnapshot | None") -> None:
+        with self._lock:
+            self._snapshot = snapshot
+            self._snapshot_checked = weakref.WeakSet()
+
+    def drop_snapshot(self, snapshot: "PlanSnapshot") -> None:
+        """
+        stops using snapshot if it is the one in use. lookups read it with
+        the lock held, so none is still reading it once this returns.
+        """
+        with self._lock:
+            if self._snapshot is snapshot:
+                self.use_snapshot(None)
+
+    def put(self, origin: type, plan: ResolutionPlan) -> None:
+        with self._lock:
+            per_origin = self._plans.get(origin)
+            if per_origin is None:
+                replaced = self._versions.replaced(origin)
+                if replaced is not None:
+                    self._plans.pop(replaced, None)
+                per_origin = self._plans[origin] = {}
+            per_origin[(plan.target_base, plan.return_bound_as_fallback)] = plan
+
+    def invalidate(self, module: ModuleType | str) -> None:
+        """
+        drops the plans of classes defined in module, and plans targeting or
+        fixing values to its classes.
+        """
+        with self._lock:
+            invalidate_per_class(
+                self._plans,
+                module_name(module),
+                lambda plan: [entry.value for entry in plan.entries],
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+            self._versions.clear()
+            self._snapshot_checked = weakref.WeakSet()
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in list(self._plans.values()))
+
+
+plan_cache = PlanCache()
@@ -0,0 +1,82 @@
+import importlib
+import pkgutil
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+
+from paramsight._param_table import _generic_ancestors, build_param_table
+from paramsight._paramsight import (
+    _resolve_alias,
+    get_resolution_plans,
+    get_resolved_typevars_for_base,
+)
+from paramsight._snapshot import module_classes
+
+
+def _walk_modules(module: ModuleType | str) -> list[ModuleType]:
+    if isinstance(module, str):
+        module = importlib.import_module(module)
+    modules = [module]
+    path = getattr(module, "__path__", None)
+    if path is not None:
+        for info in pkgutil.walk_packages(path, module.__name__ + "."):
+            modules.append(importlib.import_module(info.name))
+    return modules
+
+
+def _prewarm_class(cls: type, targets: tuple[type, ...] | None) -> bool:
+    ancestors = _generic_ancestors(cls)
+    if not ancestors:
+        return False
+    if targets is None:
+        warmed = list(build_param_table(cls))
+    else:
+        warmed = []
+        for target_base in targets:
+            if target_base in ancestors:
+                try:
+                    get_resolution_plans(cls, (target_base,))
+                except ValueError:
+                    continue
+                warmed.append(target_base)
+    # the class itself, and its instances, then resolve with a cache hit
+    for target_base in warmed:
+        get_resolved_typevars_for_base(cls, target_base)
+        _resolve_alias(cls, target_base, False)
+    return True
+
+
+def prewarm(
+    modules: ModuleType | str | Iterable[ModuleType | str],
+    targets: Iterable[type] | None = None,
+    workers: int = 1,
+) -> list[type]:
+    """
+    compiles the plans of every generic class defined in modules (packages
+    are walked, importing their submodules) against every generic ancestor,
+    or only against targets if given, and caches what each class resolves
+    to on them. with workers > 1 classes are warmed in a thread pool.
+    returns the classes warmed.
+
+    meant to run in a preforking parent, so forked workers start with warm
+    caches.
+    """
+    if isinstance(modules, ModuleType | str):
+        modules = [modules]
+    classes = list(
+        dict.fromkeys(
+            cls
+            for module in modules
+            for walked in _walk_modules(module)
+            for cls in module_classes(walked)
+        )
+    )
+    target_bases = None if targets is None else tuple(targets)
+    if workers > 1:
+        with ThreadPoolExecutor(workers) as pool:
+            warmed = list(
+                pool.map(lambda cls: _prewarm_class(cls, target_bases), classes)
+            )
+    else:
+        warmed = [_prewarm_class(cls, target_bases) for cls in classes]
+    return [cls for cls, was_warmed in zip(classes, warmed, strict=True) if was_warmed]
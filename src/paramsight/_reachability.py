@@ -0,0 +1,53 @@
+import threading
+import weakref
+from collections.abc import Iterable
+from types import ModuleType
+
+from paramsight._class_versions import module_name
+
+
+class ReachabilityIndex:
+    """
+    the set of ancestors of each class, built from its __mro__ on first use,
+    so asking whether a target base can be reached from a class is a set
+    lookup instead of a scan. a class's own set leaves the class out, since
+    the set is stored under the class and must not keep it alive.
+    """
+
+    def __init__(self):
+        self._ancestors: weakref.WeakKeyDictionary[type, frozenset[type]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def ancestors(self, cls: type) -> frozenset[type]:
+        ancestors = self._ancestors.get(cls)
+        if ancestors is None:
+            ancestors = frozenset(cls.__mro__[1:])
+            with self._lock:
+                self._ancestors[cls] = ancestors
+        return ancestors
+
+    def reaches(self, cls: type, target_base: type) -> bool:
+        return target_base is cls or target_base in self.ancestors(cls)
+
+    def reaches_any(self, cls: type, target_bases: Iterable[type]) -> bool:
+        ancestors = self.ancestors(cls)
+        return any(t is cls or t in ancestors for t in target_bases)
+
+    def invalidate(self, module: ModuleType | str) -> None:
+        name = module_name(module)
+        with self._lock:
+            for cls in list(self._ancestors.keys()):
+                if cls.__module__ == name:
+                    self._ancestors.pop(cls, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ancestors.clear()
+
+    def __len__(self) -> int:
+        return len(self._ancestors)
+
+
+reachability_index = ReachabilityIndex()
@@ -0,0 +1,125 @@
+import threading
+from collections.abc import Callable, Hashable
+from types import GenericAlias, ModuleType
+
+from paramsight._class_versions import ClassVersions, PerClassCache
+from paramsight.type_utils import specialization_key, typed_args
+
+type ResolvedTypevars = tuple[type | GenericAlias | None, ...]
+
+
+class ResolutionCache:
+    """
+    process-wide cache of typevar resolution results.
+
+    entries are stored per origin class in a PerClassCache, which holds
+    origins weakly and keeps at most max_entries_per_class entries for each:
+    Plain[Dyn] keeps Dyn alive only until enough newer specializations of
+    Plain are cached. when a class is redefined (eg. its module is reloaded)
+    the entries of the class it replaced are dropped, and invalidate(module)
+    drops everything involving a module's classes.
+    """
+
+    def __init__(self, max_entries_per_class: int = 256):
+        self._versions = ClassVersions()
+        self._lock = threading.RLock()
+        self._entries = PerClassCache(
+            max_entries_per_class, self._lock, self._drop_replaced
+        )
+        # results for plain classes, keyed by the class itself. looking these
+        # up skips the origin / args normalization, see get_or_resolve_class
+        self._by_class = PerClassCache(
+            max_entries_per_class, self._lock, self._drop_replaced
+        )
+
+    @property
+    def max_entries_per_class(self) -> int:
+        return self._entries.max_entries_per_class
+
+    @max_entries_per_class.setter
+    def max_entries_per_class(self, value: int) -> None:
+        self._entries.max_entries_per_class = value
+        self._by_class.max_entries_per_class = value
+
+    @property
+    def hits(self) -> int:
+        return self._entries.hits + self._by_class.hits
+
+    @property
+    def misses(self) -> int:
+        return self._entries.misses + self._by_class.misses
+
+    @staticmethod
+    def _split_key(
+        cls: type | GenericAlias,
+        target_base: type,
+        return_bound_as_fallback: bool,
+        substitute_nested: bool,
+    ) -> tuple[type, Hashable]:
+        origin, args = specialization_key(cls)
+        return origin, (
+            typed_args(args),
+            target_base,
+            return_bound_as_fallback,
+            substitute_nested,
+        )
+
+    def get_or_resolve(
+        self,
+        cls: type | GenericAlias,
+        target_base: type,
+        return_bound_as_fallback: bool,
+        resolve: Callable[[], ResolvedTypevars],
+        substitute_nested: bool = False,
+    ) -> ResolvedTypevars:
+        origin, key = self._split_key(
+            cls, target_base, return_bound_as_fallback, substitute_nested
+        )
+        return self._entries.get_or_compute(origin, key, resolve)
+
+    def get_or_resolve_class(
+        self,
+        cls: type,
+        target_base: type,
+        return_bound_as_fallback: bool,
+        resolve: Callable[[], ResolvedTypevars],
+    ) -> ResolvedTypevars:
+        """
+        get_or_resolve for a class rather than an alias: a hit is two dict
+        lookups on the class object, which is what instance resolution sees.
+        """
+        return self._by_class.get_or_compute(
+            cls, (target_base, return_bound_as_fallback), resolve
+        )
+
+    def _drop_replaced(self, cls: type) -> None:
+        replaced = self._versions.replaced(cls)
+        if replaced is not None:
+            self._entries.pop(replaced)
+            self._by_class.pop(replaced)
+
+    def invalidate(self, module: ModuleType | str) -> None:
+        """
+        drops every entry whose class, target base, args or result involve a
+        class defined in module.
+        """
+        self._entries.invalidate(module)
+        self._by_class.invalidate(module)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_class.clear()
+            self._versions.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._by_class)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(entries={len(self)},"
+            f" hits={self.hits}, misses={self.misses})"
+        )
+
+
+resolution_cache = ResolutionCache()
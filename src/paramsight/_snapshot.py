@@ -0,0 +1,452 @@
+import importlib
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from collections.abc import Iterable
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from paramsight._fingerprint import module_fingerprint
+from paramsight._param_table import _generic_ancestors, build_param_table
+from paramsight._plan import PlanEntry, PlanSource, ResolutionPlan, plan_cache
+from paramsight.type_utils import (
+    _NODEFAULT,
+    _is_typevar,
+    get_args_robust,
+    get_origin_robust,
+    get_parameters,
+    is_generic_alias,
+)
+
+# layout, in native 32 bit words after the magic:
+#   header   _BOM, _FORMAT_VERSION, n_strings, blob_bytes, n_record_words,
+#            n_index_words
+#   strings  n_strings + 1 byte offsets into the utf-8 blob, the blob padded
+#            to a word boundary
+#   records  one per class: n_modules, module indices (fingerprinted), then
+#            n_plans x (target ref, n_entries, entries)
+#   index    platform tag, n_modules x (name, source hash),
+#            n_classes x (module, qualname, record offset, record length)
+# strings are referenced by index. an entry is (source, arg_index + 1,
+# fixed_at + 1, value), 0 standing for None; values are tagged below.
+_MAGIC = b"PSIGHT\x00\x00"
+_BOM = 0x01020304
+_FORMAT_VERSION = 1
+_HEADER_WORDS = 6
+_SOURCES: tuple[PlanSource, ...] = ("fixed", "default", "bound", "none")
+
+# value tags
+_NONE = 0
+_NODEFAULT_TAG = 1
+_ELLIPSIS = 2
+_CLASS = 3  # module, qualname
+_TYPEVAR = 4  # index in the parameters of the class fixing the value
+_ALIAS = 5  # origin value, n_args, arg values
+
+
+class _UnencodableError(Exception):
+    pass
+
+
+class _MalformedSnapshotError(Exception):
+    pass
+
+
+def _platform_tag() -> str:
+    return f"{sys.implementation.cache_tag}-{sys.byteorder}-v{_FORMAT_VERSION}"
+
+
+def _resolve_ref(module: str, qualname: str) -> Any:
+    obj: Any = sys.modules.get(module) or importlib.import_module(module)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def module_classes(module: ModuleType) -> list[type]:
+    """the classes defined in module, including nested ones"""
+    classes: list[type] = []
+    stack = [v for v in vars(module).values() if isinstance(v, type)]
+    while stack:
+        cls = stack.pop()
+        if cls.__module__ != module.__name__ or cls in classes:
+            continue
+        classes.append(cls)
+        stack.extend(v for v in vars(cls).values() if isinstance(v, type))
+    return classes
+
+
+class _Encoder:
+    def __init__(self):
+        self.strings: dict[str, int] = {}
+        self.modules: dict[str, int] = {}
+
+    def string(self, s: str) -> int:
+        return self.strings.setdefault(s, len(self.strings))
+
+    def module(self, name: str) -> int:
+        if name not in self.modules:
+            digest = module_fingerprint(name)
+            if digest is None:
+                raise _UnencodableError(name)
+            self.string(name)
+            self.string(digest)
+            self.modules[name] = len(self.modules)
+        return self.modules[name]
+
+    def class_ref(self, cls: Any, words: array) -> None:
+        module = getattr(cls, "__module__", None)
+        qualname = getattr(cls, "__qualname__", None)
+        if not isinstance(module, str) or not isinstance(qualname, str):
+            raise _UnencodableError(cls)
+        try:
+            found = _resolve_ref(module, qualname)
+        except (ImportError, AttributeError) as e:
+            raise _UnencodableError(cls) from e
+        if found is not cls:
+            raise _UnencodableError(cls)
+        words.extend((self.string(module), self.string(qualname)))
+
+    def value(self, value: Any, owner_params: tuple[Any, ...], words: array) -> None:
+        if value is None:
+            words.append(_NONE)
+        elif value is _NODEFAULT:
+            words.append(_NODEFAULT_TAG)
+        elif value is Ellipsis:
+            words.append(_ELLIPSIS)
+        elif _is_typevar(value):
+            index = next((i for i, p in enumerate(owner_params) if p is value), None)
+            if index is None:
+                raise _UnencodableError(value)
+            words.extend((_TYPEVAR, index))
+        elif is_generic_alias(value):
+            args = get_args_robust(value)
+            words.append(_ALIAS)
+            self.value(get_origin_robust(value), owner_params, words)
+            words.append(len(args))
+            for arg in args:
+                self.value(arg, owner_params, words)
+        elif isinstance(value, type):
+            words.append(_CLASS)
+            self.class_ref(value, words)
+        else:
+            raise _UnencodableError(value)
+
+    def record(self, cls: type, table: dict[type, ResolutionPlan]) -> array:
+        words = array("I")
+        # builtin modules are covered by the platform tag
+        modules = sorted(
+            {
+                self.module(c.__module__)
+                for c in cls.__mro__
+                if c.__module__ not in sys.builtin_module_names
+            }
+        )
+        words.append(len(modules))
+        words.extend(modules)
+        words.append(len(table))
+        for target_base, plan in table.items():
+            self.class_ref(target_base, words)
+            words.append(len(plan.entries))
+            for entry in plan.entries:
+                words.append(_SOURCES.index(entry.source))
+                words.append(0 if entry.arg_index is None else entry.arg_index + 1)
+                words.append(0 if entry.fixed_at is None else entry.fixed_at + 1)
+                self.value(entry.value, _owner_params(cls, entry.fixed_at), words)
+        return words
+
+
+def _owner_params(cls: type, fixed_at: int | None) -> tuple[Any, ...]:
+    if fixed_at is None:
+        return ()
+    return tuple(get_parameters(cls.__mro__[fixed_at]))
+
+
+def _decode_value(
+    words: Any, pos: int, strings: list[str], owner_params: tuple[Any, ...]
+) -> tuple[Any, int]:
+    tag = words[pos]
+    pos += 1
+    if tag == _NONE:
+        return None, pos
+    if tag == _NODEFAULT_TAG:
+        return _NODEFAULT, pos
+    if tag == _ELLIPSIS:
+        return Ellipsis, pos
+    if tag == _TYPEVAR:
+        return owner_params[words[pos]], pos + 1
+    if tag == _CLASS:
+        return _resolve_ref(strings[words[pos]], strings[words[pos + 1]]), pos + 2
+    if tag == _ALIAS:
+        origin, pos = _decode_value(words, pos, strings, owner_params)
+        n_args = words[pos]
+        pos += 1
+        args = []
+        for _ in range(n_args):
+            arg, pos = _decode_value(words, pos, strings, owner_params)
+            args.append(arg)
+        return origin[tuple(args)], pos
+    raise ValueError(f"unknown value tag {tag}")
+
+
+def _decode_record(
+    cls: type, words: Any, strings: list[str]
+) -> dict[type, ResolutionPlan]:
+    pos = 1 + words[0]
+    n_plans = words[pos]
+    pos += 1
+    table = {}
+    for _ in range(n_plans):
+        target_base = _resolve_ref(strings[words[pos]], strings[words[pos + 1]])
+        n_entries = words[pos + 2]
+        pos += 3
+        entries = []
+        for _ in range(n_entries):
+            source, arg_index, fixed_at = words[pos : pos + 3]
+            fixed_at = fixed_at - 1 if fixed_at else None
+            value, pos = _decode_value(
+                words, pos + 3, strings, _owner_params(cls, fixed_at)
+            )
+            entries.append(
+                PlanEntry(
+                    _SOURCES[source],
+                    value,
+                    arg_index - 1 if arg_index else None,
+                    fixed_at,
+                )
+            )
+        table[target_base] = ResolutionPlan(target_base, tuple(entries))
+    return table
+
+
+def save_snapshot(path: str | Path, sources: Iterable[type | ModuleType]) -> int:
+    """
+    writes the plans from each class (or each class defined in each module)
+    to all of its generic ancestors to path, and returns how many classes
+    were written. a class is left out if anything in its plans can't be
+    referenced by module and qualname; it resolves live after loading.
+    """
+    encoder = _Encoder()
+    records: list[tuple[type, array]] = []
+    for source in sources:
+        if isinstance(source, ModuleType):
+            classes = module_classes(source)
+        else:
+            classes = [source]
+        for cls in classes:
+            try:
+                if not _generic_ancestors(cls):
+                    continue
+                table = build_param_table(cls)
+                words = encoder.record(cls, table)
+                encoder.string(cls.__module__)
+                encoder.string(cls.__qualname__)
+                # only keep records that decode back to the same plans
+                if _decode_record(cls, words, list(encoder.strings)) != table:
+                    continue
+            except (_UnencodableError, ValueError, TypeError):
+                continue
+            records.append((cls, words))
+
+    index = array("I", [encoder.string(_platform_tag()), len(encoder.modules)])
+    for name in encoder.modules:
+        digest = module_fingerprint(name)
+        assert digest is not None
+        index.extend((encoder.strings[name], encoder.strings[digest]))
+    index.append(len(records))
+    record_words = array("I")
+    for cls, words in records:
+        index.extend(
+            (
+                encoder.strings[cls.__module__],
+                encoder.strings[cls.__qualname__],
+                len(record_words),
+                len(words),
+            )
+        )
+        record_words.extend(words)
+
+    encoded = [s.encode() for s in encoder.strings]
+    offsets = array("I", [0])
+    for b in encoded:
+        offsets.append(offsets[-1] + len(b))
+    blob = b"".join(encoded)
+    blob += b"\x00" * (-len(blob) % 4)
+    header = array(
+        "I",
+        [
+            _BOM,
+            _FORMAT_VERSION,
+            len(encoded),
+            len(blob),
+            len(record_words),
+            len(index),
+        ],
+    )
+    # written next to path and renamed over it, so a process that has the
+    # old snapshot mapped keeps reading the old file, and one loading it
+    # never sees a partly written one
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_MAGIC)
+            for part in (header, offsets):
+                f.write(part.tobytes())
+            f.write(blob)
+            for part in (record_words, index):
+                f.write(part.tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(records)
+
+
+class PlanSnapshot:
+    """
+    a snapshot written by save_snapshot, memory mapped. the index is read on
+    load; a class's plans are decoded from the mapping when it is first
+    resolved, provided the source of every module in its mro still hashes
+    to what it did when the snapshot was written.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._index: dict[tuple[str, str], tuple[int, int]] = {}
+        self._hashes: dict[str, str] = {}
+        self._strings: list[str] = []
+        self._module_names: list[str] = []
+        self.loaded = 0
+        self.compatible = False
+        self.closed = False
+        with open(self.path, "rb") as f:
+            head = f.read(len(_MAGIC))
+            # a truncated snapshot is malformed rather than some other file
+            if head != _MAGIC[: len(head)]:
+                raise ValueError(f"{self.path} is not a paramsight snapshot")
+            size = os.fstat(f.fileno()).st_size
+            self._mmap = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+            )
+        self._words = memoryview(b"").cast("I")
+        try:
+            self._read_index(size)
+        except (_MalformedSnapshotError, IndexError, ValueError, UnicodeDecodeError):
+            # treated like a snapshot from another version: everything
+            # compiles live
+            self._index.clear()
+            self._hashes.clear()
+            self._strings = []
+            self._module_names = []
+            self.compatible = False
+
+    def _read_index(self, size: int) -> None:
+        if self._mmap is None or size < len(_MAGIC) + 4 * _HEADER_WORDS:
+            raise _MalformedSnapshotError(self.path)
+        if (size - len(_MAGIC)) % 4:
+            raise _MalformedSnapshotError(self.path)
+        self._words = memoryview(self._mmap)[len(_MAGIC) :].cast("I")
+        header = self._words[:_HEADER_WORDS]
+        if header[0] != _BOM or header[1] != _FORMAT_VERSION:
+            return
+        _, _, n_strings, blob_bytes, n_record_words, n_index_words = header
+        n_words = _HEADER_WORDS + n_strings + 1 + blob_bytes // 4
+        n_words += n_record_words + n_index_words
+        if blob_bytes % 4 or n_words != len(self._words) or n_index_words < 2:
+            raise _MalformedSnapshotError(self.path)
+        pos = _HEADER_WORDS
+        offsets = self._words[pos : pos + n_strings + 1]
+        pos += n_strings + 1
+        if offsets[0] != 0 or offsets[-1] > blob_bytes:
+            raise _MalformedSnapshotError(self.path)
+        blob_start = len(_MAGIC) + 4 * pos
+        self._strings = [
+            self._mmap[blob_start + start : blob_start + end].decode()
+            for start, end in zip(offsets[:-1], offsets[1:], strict=True)
+        ]
+        pos += blob_bytes // 4
+        self._records_start = pos
+        index = self._words[pos + n_record_words : pos + n_record_words + n_index_words]
+        strings = self._strings
+        if strings[index[0]] != _platform_tag():
+            return
+        n_modules = index[1]
+        module_names = []
+        for i in range(2, 2 + 2 * n_modules, 2):
+            module_names.append(strings[index[i]])
+            self._hashes[strings[index[i]]] = strings[index[i + 1]]
+        self._module_names = module_names
+        pos = 2 + 2 * n_modules
+        for _ in range(index[pos]):
+            module, qualname, offset, length = index[pos + 1 : pos + 5]
+            if offset + length > n_record_words:
+                raise _MalformedSnapshotError(self.path)
+            self._index[(strings[module], strings[qualname])] = (offset, length)
+            pos += 4
+        if pos + 1 != n_index_words:
+            raise _MalformedSnapshotError(self.path)
+        self.compatible = True
+
+    def plans_for(self, cls: type) -> dict[type, ResolutionPlan] | None:
+        """
+        the stored plans of cls, or None when it isn't in the snapshot or its
+        fingerprint doesn't match, or once the snapshot is closed.
+        """
+        if self.closed:
+            return None
+        location = self._index.get(
+            (getattr(cls, "__module__", ""), getattr(cls, "__qualname__", ""))
+        )
+        if location is None:
+            return None
+        start = self._records_start + location[0]
+        words = self._words[start : start + location[1]]
+        try:
+            for i in words[1 : 1 + words[0]]:
+                name = self._module_names[i]
+                if module_fingerprint(name) != self._hashes[name]:
+                    return None
+            if _resolve_ref(cls.__module__, cls.__qualname__) is not cls:
+                return None
+            table = _decode_record(cls, words, self._strings)
+        except Exception:
+            return None
+        self.loaded += 1
+        return table
+
+    def close(self) -> None:
+        """
+        unmaps the file, first detaching the snapshot from plan lookups if
+        load_snapshot made it the one in use.
+        """
+        if self.closed:
+            return
+        plan_cache.drop_snapshot(self)
+        self.closed = True
+        self._words.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({str(self.path)!r}, classes={len(self)},"
+            f" loaded={self.loaded}, compatible={self.compatible})"
+        )
+
+
+def load_snapshot(path: str | Path) -> PlanSnapshot:
+    """
+    maps a snapshot written by save_snapshot and makes plan lookups fall back
+    to it before compiling. classes whose fingerprint doesn't match (or a
+    snapshot from another python version) are compiled live as usual.
+    """
+    snapshot = PlanSnapshot(path)
+    plan_cache.use_snapshot(snapshot)
+    return snapshot
@@ -0,0 +1,110 @@
+import functools
+import types
+from collections.abc import Callable
+from typing import Any
+
+from paramsight._alias_cache import variant_cache
+from paramsight._dispatch import _is_alias_or_class
+from paramsight._paramsight import _effective_alias, _resolve_alias
+from paramsight.inject_locals import _rewrite_with_locals
+from paramsight.type_utils import (
+    _NODEFAULT,
+    _is_typevar,
+    get_parameters,
+    specialization_key,
+)
+
+
+def _typevars_used(fn: types.FunctionType) -> dict[str, Any]:
+    """
+    the typevars fn refers to by name: type params of its class (closure
+    cells) and module level TypeVars (globals), including from nested code.
+    """
+    found = {}
+    for name, cell in zip(fn.__code__.co_freevars, fn.__closure__ or (), strict=True):
+        try:
+            value = cell.cell_contents
+        except ValueError:  # an empty cell
+            continue
+        if _is_typevar(value):
+            found[name] = value
+    stack = [fn.__code__]
+    while stack:
+        code = stack.pop()
+        for name in code.co_names:
+            value = fn.__globals__.get(name)
+            if _is_typevar(value):
+                found[name] = value
+        stack.extend(c for c in code.co_consts if isinstance(c, types.CodeType))
+    return found
+
+
+def _defining_class(origin: type, specialized: Callable[..., Any]) -> type | None:
+    """the class in origin's mro whose __dict__ holds specialized"""
+    for klass in origin.__mro__:
+        attr = klass.__dict__.get(specialized.__name__)
+        if getattr(attr, "__func__", attr) is specialized:
+            return klass
+    return None
+
+
+def _build_variant(
+    fn: types.FunctionType,
+    specialized: Callable[..., Any],
+    typevars: dict[str, Any],
+    alias: type | types.GenericAlias,
+) -> Callable[..., Any]:
+    origin, _ = specialization_key(alias)
+    # old style generics share module level typevars, so a typevar is looked
+    # up from the class the method is written in, not from origin
+    definer = _defining_class(origin, specialized) or origin
+    # the variant is compiled outside the class scope fn closes over, so
+    # typevars that don't resolve are bound to themselves
+    bindings = dict(typevars)
+    for name, typevar in typevars.items():
+        owner = next((c for c in definer.__mro__ if typevar in get_parameters(c)), None)
+        if owner is None:
+            continue
+        index = list(get_parameters(owner)).index(typevar)
+        value = _resolve_alias(alias, owner, False)[index]
+        if value is not None and value is not _NODEFAULT:
+            bindings[name] = value
+    if all(bindings[name] is typevar for name, typevar in typevars.items()):
+        return fn
+    return _rewrite_with_locals(fn, bindings, ("specialize",))
+
+
+def specialize[**P, R](fn: Callable[P, R]) -> Callable[P, R]:
+    """
+    compiles a variant of fn per alias it is called through, with the
+    typevars its body names bound to what the alias resolves them to, eg.
+
+        class Vec[T]:
+            @takes_alias
+            @classmethod
+            @specialize
+            def zero(cls):
+                return T(0)  # T is int in the variant for Vec[int]
+
+    the alias is the first argument when it is a class or alias (takes_alias
+    methods), and the __orig_class__ or class of the first argument
+    otherwise (instance methods). variants are cached per (fn, alias), so
+    later calls skip resolution. each typevar is resolved on the class fn is
+    defined in. the body is rewritten like inject_locals does, so fn needs
+    its source and @specialize has to be its innermost decorator. typevars
+    left unresolved keep their typevar.
+    """
+    assert isinstance(fn, types.FunctionType)
+    typevars = _typevars_used(fn)
+    if not typevars:
+        return fn
+
+    @functools.wraps(fn)
+    def specialized(first: Any, *args: Any, **kwargs: Any) -> Any:
+        alias = first if _is_alias_or_class(first) else _effective_alias(first)
+        variant = variant_cache.get_or_compute(
+            alias, fn, lambda: _build_variant(fn, specialized, typevars, alias)
+        )
+        return variant(first, *args, **kwargs)
+
+    return specialized  # type: ignore[return-value]
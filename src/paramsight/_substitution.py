@@ -0,0 +1,69 @@
+from typing import Any
+
+from paramsight._class_versions import PerClassCache
+from paramsight.type_utils import _NODEFAULT, _is_pydantic, _is_typevar, typed_args
+
+
+def free_typevars(tp: Any) -> tuple[Any, ...]:
+    """
+    the type parameters still free in tp, eg. (K, V) for dict[K, list[V]].
+    handles typing / builtin aliases and parametrized pydantic models.
+    """
+    if _is_typevar(tp):
+        return (tp,)
+    if isinstance(tp, type):
+        if not _is_pydantic(tp):
+            return ()
+        metadata = getattr(tp, "__pydantic_generic_metadata__", None)
+        if metadata is None or metadata["origin"] is None:
+            return ()
+        return tuple(metadata["parameters"])
+    return tuple(getattr(tp, "__parameters__", ()))
+
+
+def _substitute(tp: Any, mapping: dict[Any, Any]) -> Any:
+    if _is_typevar(tp):
+        return mapping.get(tp, tp)
+    params = free_typevars(tp)
+    if not params:
+        return tp
+    args = tuple(mapping.get(p, p) for p in params)
+    if args == params:
+        return tp
+    return tp[args]
+
+
+class SubstitutionCache(PerClassCache):
+    """
+    memoized substitution of typevars inside type expressions. entries are
+    stored per class the expression is written in (the owner), and keyed by
+    (expression, values substituted for the owner's params).
+    """
+
+    def substitute(
+        self,
+        owner: type,
+        tp: Any,
+        params: tuple[Any, ...],
+        values: tuple[Any, ...],
+    ) -> Any:
+        """
+        replaces params with values inside tp, however deeply nested.
+        parameters whose value is None or NoDefault are left in place.
+        """
+        return self.get_or_compute(
+            owner,
+            (tp, typed_args(values)),
+            lambda: _substitute(tp, _mapping(params, values)),
+        )
+
+
+def _mapping(params: tuple[Any, ...], values: tuple[Any, ...]) -> dict[Any, Any]:
+    return {
+        param: value
+        for param, value in zip(params, values, strict=True)
+        if value is not None and value is not _NODEFAULT
+    }
+
+
+substitution_cache = SubstitutionCache()
@@ -0,0 +1,52 @@
+from types import GenericAlias
+from typing import Any
+
+from paramsight._paramsight import _effective_alias, _resolve_alias
+from paramsight.aliasclassmethod import _install_ga_proxy
+from paramsight.type_utils import get_num_typevars
+
+
+class TypeParam:
+    """
+    a type parameter of base as a class attribute, eg.
+
+        class Foo[T](Base[T]):
+            item_type = TypeParam(Base, 0)
+
+    Foo[int].item_type, IntFoo.item_type and Foo[int]().item_type are int.
+    read from an alias it resolves the alias (the _GAProxy passes itself,
+    as for takes_alias methods), from an instance its __orig_class__ (set
+    only once __init__ has returned) or its class. results come from the
+    per alias resolution_cache, so a read is a cache hit. on a pydantic model
+    annotate it as a ClassVar.
+    """
+
+    # read through _GAProxy with the proxy as owner, like takes_alias methods
+    _acm_takes_alias = True
+
+    def __init__(
+        self, base: type, index: int = 0, return_bound_as_fallback: bool = False
+    ):
+        if not 0 <= index < get_num_typevars(base):
+            raise ValueError(
+                f"{base} has {get_num_typevars(base)} type parameters, no index {index}"
+            )
+        self.base = base
+        self.index = index
+        self.return_bound_as_fallback = return_bound_as_fallback
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        _install_ga_proxy(owner)
+
+    def __get__(
+        self, instance: Any, owner: type | GenericAlias | None = None
+    ) -> type | GenericAlias | None:
+        alias = owner if instance is None else _effective_alias(instance)
+        assert alias is not None
+        return _resolve_alias(alias, self.base, self.return_bound_as_fallback)[
+            self.index
+        ]
+
+    def __repr__(self) -> str:
+        return f"TypeParam({self.base.__qualname__}, {self.index})"
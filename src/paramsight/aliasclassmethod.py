@@ -1,6 +1,8 @@
 import inspect
+import threading
 import types
 import typing
+import weakref
 from collections.abc import Callable
 from functools import partial
 from typing import Concatenate, cast, overload
@@ -9,7 +11,11 @@ from paramsight._ta_ref_attr import _TA_REF_ATTR
 from paramsight.alias_super import _super
 from paramsight.ga_proxy import _GAProxy
 from paramsight.inject_locals import inject_locals
-from paramsight.type_utils import _is_pydantic
+from paramsight.type_utils import _is_pydantic, typed_args
+
+_PROXY_CACHE_ATTR = "_ga_proxy_cache__"
+# proxies kept per class; each holds its args strongly
+_PROXY_CACHE_SIZE = 256
 
 
 def _is_specialized_generic(cls):
@@ -45,11 +51,41 @@ def _make_patched_cgi(owner, parent):
         assert _base is _base_cgi
         alias = _base_cgi(cls, key)  # a types.GenericAlias
         assert not _is_pydantic(cls)
-        return make_alias_instance_from_alias(_GAProxy, alias)  # our thin wrapper
+        return _cached_proxy(cls, alias)
 
     return _patched_cgi
 
 
+def _cached_proxy(cls, alias):
+    """
+    the _GAProxy wrapping alias, one per (class, args), so repeated
+    subscription hands out the same proxy and caches keyed on it share
+    entries. the per-class dict lives in the class's own __dict__, so it
+    goes away with the class, and keeps the _PROXY_CACHE_SIZE most recently
+    made proxies, so it doesn't pin the args of every alias ever made.
+    """
+    proxies = cls.__dict__.get(_PROXY_CACHE_ATTR)
+    if proxies is None:
+        with _install_lock:
+            proxies = cls.__dict__.get(_PROXY_CACHE_ATTR)
+            if proxies is None:
+                proxies = {}
+                setattr(cls, _PROXY_CACHE_ATTR, proxies)
+    key = typed_args(alias.__args__)
+    try:
+        proxy = proxies.get(key)
+    except TypeError:  # unhashable args, eg. Annotated metadata
+        return make_alias_instance_from_alias(_GAProxy, alias)
+    if proxy is None:
+        proxy = make_alias_instance_from_alias(_GAProxy, alias)  # our thin wrapper
+        with _install_lock:
+            proxy = proxies.setdefault(key, proxy)
+            if len(proxies) > _PROXY_CACHE_SIZE:
+                # oldest first; hits don't reorder, so lookups stay lock free
+                del proxies[next(iter(proxies))]
+    return proxy
+
+
 def _make_patched_init_subclass(owner):
     _orig_init_subclass = inspect.getattr_static(owner, "__init_subclass__")
     if hasattr(_orig_init_subclass, "__func__"):
@@ -59,14 +95,56 @@ def _make_patched_init_subclass(owner):
     def _patched_init_subclass(cls, *a, **kw):
         super(owner, cls).__init_subclass__(*a, **kw)
         _install_ga_proxy(cls)
+        _run_subclass_hooks(cls)
         return
 
     return _patched_init_subclass
 
 
+_install_lock = threading.RLock()
+
+# callbacks run for every new subclass of a class, held as weak methods so a
+# subscriber can go away without unsubscribing
+_subclass_hooks: weakref.WeakKeyDictionary[type, list[weakref.WeakMethod]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _add_subclass_hook(base, hook):
+    """
+    calls the bound method hook with every subclass of base created from
+    now on, through the patched __init_subclass__. does nothing for pydantic
+    models, whose class creation isn't patched.
+    """
+    with _install_lock:
+        _install_ga_proxy(base)
+        hooks = _subclass_hooks.setdefault(base, [])
+        hooks[:] = [ref for ref in hooks if ref() is not None]
+        hooks.append(weakref.WeakMethod(hook))
+
+
+def _run_subclass_hooks(cls):
+    if not _subclass_hooks:
+        return
+    for base in cls.__mro__[1:]:
+        for ref in tuple(_subclass_hooks.get(base, ())):
+            hook = ref()
+            if hook is not None:
+                hook(cls)
+
+
 def _install_ga_proxy(owner):
     if _is_pydantic(owner):
         return
+    # checked without the lock first: once installed, the marker is the last
+    # thing set, so seeing it means the patched hooks are in place
+    if getattr(owner, "_ga_proxy_installed__", None) is owner:
+        return
+    with _install_lock:
+        _install_ga_proxy_locked(owner)
+
+
+def _install_ga_proxy_locked(owner):
     if (parent := getattr(owner, "_ga_proxy_installed__", None)) != owner:
         patched_cgi = _make_patched_cgi(owner, parent)
         if patched_cgi is not None:
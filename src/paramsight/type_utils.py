@@ -55,9 +55,10 @@ def _get_typevar_default(tv: Any) -> Any:
 
 
 def unwrap_annotated(param: Any) -> type:
-    inner = get_origin_robust(param)
-    if inner is Annotated:
-        return unwrap_annotated(get_args_robust(param)[0])
+    # Annotated (like ClassVar etc.) is a special form rather than a type, so
+    # this checks with get_origin, not get_origin_robust
+    if not _is_pydantic(param) and get_origin(param) is Annotated:
+        return unwrap_annotated(get_args(param)[0])
     return param
 
 
@@ -139,3 +140,46 @@ def _is_pydantic(cls):
             )
         )
     )
+
+
+type SpecializationKey = tuple[type, tuple[Any, ...]]
+
+
+def _simple_alias_types() -> frozenset[type]:
+    from paramsight.ga_proxy import _GAProxy
+
+    return frozenset((typing._GenericAlias, GenericAlias, _GAProxy))  # type: ignore
+
+
+_SIMPLE_ALIAS_TYPES = _simple_alias_types()
+
+
+def specialization_key(t: Any) -> SpecializationKey:
+    """
+    the canonical (origin, args) of a class or alias, equal to
+    (get_origin_robust(t) or t, get_args_robust(t)). a typing alias, a
+    _GAProxy and a pydantic parametrized class of the same specialization
+    give the same key; a bare class gives (cls, ()). the common forms are
+    read directly off the object.
+    """
+    if type(t) in _SIMPLE_ALIAS_TYPES:
+        return t.__origin__, t.__args__
+    if isinstance(t, pydantic_model_metaclass):
+        metadata = getattr(t, "__pydantic_generic_metadata__", None)
+        if metadata is not None and metadata["origin"] is not None:
+            return metadata["origin"], metadata["args"]
+        return t, ()
+    if isinstance(t, type):
+        return t, ()
+    origin = get_origin_robust(t) or t
+    assert isinstance(origin, type)
+    return origin, get_args_robust(t)
+
+
+def typed_args(args: tuple[Any, ...]) -> tuple[Any, ...]:
+    """
+    args made into a cache key that tells equal args of different types
+    apart, eg. the 1 of Lit[1] and the True of Lit[True], as typing's own
+    typed subscription cache does. classes are kept as they are.
+    """
+    return tuple(arg if isinstance(arg, type) else (type(arg), arg) for arg in args)
@@ -0,0 +1,26 @@
+from types import GenericAlias
+
+from paramsight._mro_resolver import compile_plans_mro
+from paramsight._paramsight import GenericAliasNode
+from paramsight.type_utils import specialization_key
+
+
+def resolve_typevars_mro(
+    cls: type | GenericAlias, target_base: type, return_bound_as_fallback: bool = False
+) -> tuple[type | GenericAlias | None, ...]:
+    """
+    resolves with the mro engine directly, bypassing the caches.
+    """
+    origin, args = specialization_key(cls)
+    plans = compile_plans_mro(origin, (target_base,), return_bound_as_fallback)
+    return plans[target_base].apply(args)
+
+
+def resolve_from_graph(
+    cls: type | GenericAlias, target_base: type, return_bound_as_fallback: bool = False
+) -> tuple[type | GenericAlias | None, ...]:
+    """
+    resolves by walking the TypeNode graph directly, bypassing the caches.
+    """
+    ga = GenericAliasNode.make(cls)
+    return ga.get_resolved_typevars_for_base(target_base, return_bound_as_fallback)
@@ -0,0 +1,206 @@
+import gc
+import types
+import weakref
+from typing import Literal, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from paramsight import param_dispatch, resolution_cache
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class Codec[T]: ...
+
+
+class Pair[K, V]: ...
+
+
+class IntCodec(Codec[int]): ...
+
+
+class Wrapped[U](Codec[list[U]]): ...
+
+
+class IntWrapped(Wrapped[int]): ...
+
+
+class Animal: ...
+
+
+class Dog(Animal): ...
+
+
+class Puppy(Dog): ...
+
+
+class M[T](BaseModel, Codec[T]):
+    field: T
+
+
+@param_dispatch(Codec)
+def encode(codec, value):
+    return "default"
+
+
+@encode.register(Codec[int])
+def _(codec, value):
+    return f"int {value}"
+
+
+@encode.register(list[int])
+def _(codec, value):
+    return "list[int]"
+
+
+@encode.register(str)
+def _(codec, value):
+    return f"str {value}"
+
+
+@encode.register(Animal)
+def _(codec, value):
+    return "animal"
+
+
+@encode.register(Dog)
+def _(codec, value):
+    return "dog"
+
+
+@param_dispatch(Pair)
+def describe(pair):
+    return "default"
+
+
+@describe.register(Pair[Animal, int])
+def _(pair):
+    return "animal, int"
+
+
+@describe.register(Dog, object)
+def _(pair):
+    return "dog, object"
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_dispatch_on_aliases_classes_and_instances():
+    assert encode(Codec[int], 1) == "int 1"
+    assert encode(IntCodec, 1) == "int 1"
+    assert encode(IntCodec(), 2) == "int 2"
+    assert encode(Codec[str](), "a") == "str a"
+    assert encode(M[str](field=""), "b") == "str b"
+    assert encode(M[int], 3) == "int 3"
+
+
+def test_unregistered_params_fall_back_to_default():
+    assert encode(Codec[bytes], b"") == "default"
+    assert encode(Codec, None) == "default"
+    assert encode(Wrapped[str], None) == "default"
+    assert encode(object(), None) == "default"
+    assert encode(Pair[int, int], None) == "default"
+
+
+def test_special_forms_match_no_registered_class():
+    assert encode(Codec[Optional[int]], None) == "default"  # noqa: UP045
+    assert encode(Codec[Literal[1]], None) == "default"
+
+    @param_dispatch(Codec)
+    def f(codec):
+        return "default"
+
+    f.register(Literal[1])(lambda codec: "one")
+    assert f(Codec[Literal[1]]) == "one"
+    assert f(Codec[Literal[2]]) == "default"
+
+
+def test_dispatch_substitutes_nested_params():
+    assert encode(Wrapped[int], None) == "list[int]"
+    assert encode(IntWrapped, None) == "list[int]"
+    assert encode(IntWrapped(), None) == "list[int]"
+
+
+def test_subclasses_match_the_most_specific_registration():
+    assert encode(Codec[Animal], None) == "animal"
+    assert encode(Codec[Dog], None) == "dog"
+    assert encode(Codec[Puppy], None) == "dog"
+
+
+def test_ambiguous_dispatch_raises():
+    assert describe(Pair[Animal, int]) == "animal, int"
+    assert describe(Pair[Puppy, str]) == "dog, object"
+    assert describe(Pair[Animal, str]) == "default"
+    with pytest.raises(RuntimeError, match="ambiguous"):
+        describe(Pair[Dog, int])
+
+
+def test_register_checks_the_number_of_params():
+    with pytest.raises(ValueError, match="takes 2 type parameters"):
+        describe.register(int)
+
+
+def test_dispatch_is_cached_per_alias():
+    @param_dispatch(Codec)
+    def f(codec):
+        return "default"
+
+    @f.register(int)
+    def _(codec):
+        return "int"
+
+    assert f.dispatch(Codec[int]) is f.dispatch(IntCodec()) is _
+    assert f(Codec[int]) == "int"
+    f.register(bytes)(lambda codec: "bytes")
+    assert f(Codec[bytes]) == "bytes"
+    assert f(Codec[int]) == "int"
+
+
+def test_dispatcher_works_as_a_method():
+    class Holder[T](Codec[T]):
+        @param_dispatch(Codec)
+        def name(self):
+            return "default"
+
+        @name.register(int)
+        def _(self):
+            return "int"
+
+    assert Holder[int]().name() == "int"
+    assert Holder[str]().name() == "default"
+    assert Holder.name.__name__ == "name"
+
+
+def test_dispatch_table_does_not_pin_classes():
+    class Local(Codec[int]): ...
+
+    ref = weakref.ref(Local)
+    assert encode(Local(), 1) == "int 1"
+    del Local
+    gc.collect()
+    assert ref() is None
+
+
+def test_dispatch_table_does_not_pin_arg_classes():
+    @param_dispatch(Codec)
+    def f(codec):
+        return "default"
+
+    f.max_entries_per_class = 4
+    refs = []
+    for _ in range(8):
+
+        class Dyn: ...
+
+        assert f(types.GenericAlias(Codec, Dyn)) == "default"
+        refs.append(weakref.ref(Dyn))
+        del Dyn
+    resolution_cache.clear()
+    gc.collect()
+    assert [ref() is None for ref in refs] == [True] * 4 + [False] * 4
@@ -0,0 +1,125 @@
+import gc
+
+import pytest
+from pydantic import BaseModel
+
+from paramsight import (
+    get_parameter_map,
+    get_resolved_typevars_for_base,
+    get_resolved_typevars_for_base_inst,
+    plan_cache,
+    resolution_cache,
+    set_resolution_engine,
+    try_resolve,
+)
+from paramsight._paramsight import _typenode_lock, _typenode_registry
+from paramsight._reachability import reachability_index
+from paramsight._substitution import substitution_cache
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class A[T]: ...
+
+
+class B[X, Y](A[Y]): ...
+
+
+class C[Z](B[str, Z]): ...
+
+
+class Mid[U](A[list[U]]): ...
+
+
+class Top[V](Mid[V]): ...
+
+
+class Left[T](A[T]): ...
+
+
+class Right[T](A[T]): ...
+
+
+class Diamond[T](Left[T], Right[T]): ...
+
+
+class Unrelated[T]: ...
+
+
+class M[T](BaseModel, A[T]):
+    field: T
+
+
+# pydantic holds parametrized models weakly, and a class is itself a cycle
+MInt = M[int]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _clear_caches():
+    resolution_cache.clear()
+    plan_cache.clear()
+    substitution_cache.clear()
+    reachability_index.clear()
+    with _typenode_lock:
+        _typenode_registry.clear()
+
+
+def _resolve_everything():
+    assert get_resolved_typevars_for_base(C[int], A) == (int,)
+    assert get_resolved_typevars_for_base(C[int], B) == (str, int)
+    assert get_resolved_typevars_for_base(Top[int], A, substitute_nested=True) == (
+        list[int],
+    )
+    assert get_resolved_typevars_for_base(Diamond[bytes], A) == (bytes,)
+    assert get_resolved_typevars_for_base(MInt, A) == (int,)
+    assert get_resolved_typevars_for_base_inst(C[float](), A) == (float,)
+    assert get_parameter_map(Top[str])[Mid] == (str,)
+    assert try_resolve(C[int], Unrelated) is None
+    assert try_resolve(Top[int], Unrelated) is None
+
+
+def _cyclic_garbage_from(fn) -> int:
+    gc.collect()
+    gc.disable()
+    try:
+        fn()
+        return gc.collect()
+    finally:
+        gc.enable()
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(params=["graph", "mro", "flat"])
+def engine(request):
+    set_resolution_engine(request.param)
+    yield request.param
+    set_resolution_engine("graph")
+
+
+def test_cold_resolution_creates_no_cycles(engine):
+    # warm the aliases and typing's own caches, then resolve from scratch
+    _resolve_everything()
+    for _ in range(3):
+        _clear_caches()
+        assert _cyclic_garbage_from(_resolve_everything) == 0
+
+
+def test_cached_resolution_creates_no_cycles(engine):
+    _resolve_everything()
+    assert _cyclic_garbage_from(_resolve_everything) == 0
+
+
+def test_dropping_the_graph_frees_it_by_refcount(engine):
+    _clear_caches()
+    _resolve_everything()
+    assert _cyclic_garbage_from(_clear_caches) == 0
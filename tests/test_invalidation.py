@@ -0,0 +1,103 @@
+import importlib
+import sys
+import textwrap
+
+import pytest
+
+from paramsight import (
+    get_resolution_plan,
+    get_resolved_typevars_for_base,
+    invalidate,
+    plan_cache,
+    resolution_cache,
+)
+from paramsight._class_versions import mentions_module
+from paramsight._paramsight import _typenode_registry
+from paramsight._substitution import substitution_cache
+
+SOURCE = """
+class Base[T]: ...
+
+
+class Mid[U](Base[list[U]]): ...
+
+
+class Fixed(Mid[{arg}]): ...
+"""
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def reloadable(tmp_path, monkeypatch):
+    name = "paramsight_reload_target"
+    path = tmp_path / f"{name}.py"
+
+    def write(arg: str):
+        path.write_text(textwrap.dedent(SOURCE.format(arg=arg)))
+        importlib.invalidate_caches()
+
+    write("int")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module(name)
+    yield module, write
+    sys.modules.pop(name, None)
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_redefined_class_drops_old_entries(reloadable):
+    module, write = reloadable
+    resolution_cache.clear()
+    plan_cache.clear()
+    old_fixed = module.Fixed
+    assert get_resolved_typevars_for_base(old_fixed, module.Mid) == (int,)
+    assert len(resolution_cache) == 1
+
+    write("str")
+    module = importlib.reload(module)
+    assert module.Fixed is not old_fixed
+    assert get_resolved_typevars_for_base(module.Fixed, module.Mid) == (str,)
+    # the entry for the replaced class is gone rather than kept alongside
+    assert len(resolution_cache) == 1
+    assert plan_cache.get(old_fixed, module.Mid, False) is None
+
+
+def test_invalidate_drops_everything_involving_module(reloadable):
+    module, _ = reloadable
+    get_resolved_typevars_for_base(module.Fixed, module.Base, substitute_nested=True)
+    get_resolved_typevars_for_base(list[module.Mid], list)
+    assert get_resolution_plan(module.Fixed, module.Base)
+    sizes = len(resolution_cache), len(plan_cache), len(substitution_cache)
+
+    invalidate(module)
+    assert (len(resolution_cache), len(plan_cache), len(substitution_cache)) < sizes
+    assert plan_cache.get(module.Fixed, module.Base, False) is None
+    for cache in (resolution_cache._entries, resolution_cache._by_class):
+        for cls, entries in cache.entries.items():
+            assert cls.__module__ != module.__name__
+            assert not any(mentions_module(key, module.__name__) for key in entries)
+    assert not any(cls.__module__ == module.__name__ for cls in _typenode_registry)
+    # still resolves, recompiled from scratch
+    assert get_resolved_typevars_for_base(
+        module.Fixed, module.Base, substitute_nested=True
+    ) == (list[int],)
+
+
+def test_local_classes_are_not_treated_as_redefinitions():
+    resolution_cache.clear()
+    classes = []
+    for arg in (int, str):
+
+        class Base[T]: ...
+
+        class Local(Base[arg]): ...
+
+        classes.append((Local, Base))
+        assert get_resolved_typevars_for_base(Local, Base) == (arg,)
+    assert len(resolution_cache) == 2
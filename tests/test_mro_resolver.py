@@ -0,0 +1,272 @@
+import gc
+import sys
+import types
+import typing
+import weakref
+from typing import Generic, TypeVar
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from pydantic import BaseModel
+from resolvers import resolve_from_graph, resolve_typevars_mro
+
+from paramsight import (
+    get_resolved_typevars_for_base,
+    invalidate,
+    set_resolution_engine,
+)
+from paramsight._flat_graph import FlatHierarchy, flat_hierarchy
+from paramsight._mro_resolver import (
+    _AmbiguousSourcesError,
+    compile_plans_mro,
+)
+from paramsight._paramsight import GenericAliasNode, _compile_plans
+
+TYPE_STRAT = st.sampled_from([int, float, str, bytes, bool])
+
+DEFAULT_SETTINGS = settings(max_examples=12, deadline=None)
+
+T = TypeVar("T")
+S = TypeVar("S", bound=int)
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class A[T]: ...
+
+
+class B[X, Y](A[Y]): ...
+
+
+class C[Z](B[str, Z]): ...
+
+
+class Left[T](A[T]): ...
+
+
+class Right[T](A[T]): ...
+
+
+class Diamond[T](Left[T], Right[T]): ...
+
+
+class FixedFirst[T](Right[str], Left[T]): ...
+
+
+class Conflicting(Left[int], Right[str]): ...
+
+
+class Inner[X](Conflicting, Left[X]): ...
+
+
+class Defaults[T, U = bytes](B[U, T]): ...
+
+
+class Bare(Left): ...
+
+
+class Old(Left[T], Generic[T]): ...
+
+
+class Bounded(A[S], Generic[S]): ...
+
+
+class M[T](BaseModel, A[T]):
+    field: T
+
+
+class ModelDiamond[T](M[T], Right[T]): ...
+
+
+class BoundedTop[T: object]: ...
+
+
+class PassBounded[U](BoundedTop[U]): ...
+
+
+class FixedThroughBound(PassBounded[int]): ...
+
+
+class BoundedDefault[T: int = bool]: ...
+
+
+class PassBoundedDefault[U](BoundedDefault[U]): ...
+
+
+class FixedThroughBoundDefault(PassBoundedDefault[bool]): ...
+
+
+CLASSES = [
+    C,
+    Diamond,
+    Defaults,
+    Bare,
+    Old,
+    Bounded,
+    M,
+    ModelDiamond,
+    FixedThroughBound,
+    FixedThroughBoundDefault,
+]
+
+# different sources meet on the way to A, so the mro and flat engines hand
+# these to the graph search
+MEETING = [FixedFirst, Conflicting, Inner]
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("cls", CLASSES)
+@pytest.mark.parametrize("fallback", [False, True])
+def test_mro_plans_match_graph_plans(cls: type, fallback: bool):
+    targets = [
+        base
+        for base in cls.__mro__
+        if base is not typing.Generic and getattr(base, "__type_params__", None)
+    ]
+    assert compile_plans_mro(cls, targets, fallback) == (
+        GenericAliasNode.make(cls).compile_plans(targets, fallback)
+    )
+
+
+@DEFAULT_SETTINGS
+@given(t=TYPE_STRAT)
+def test_mro_resolution_matches_graph_resolution(t: type):
+    for cls in CLASSES:
+        if not getattr(cls, "__type_params__", None):
+            continue
+        alias = cls[t] if cls is not Defaults else cls[t, t]
+        assert resolve_typevars_mro(alias, A) == resolve_from_graph(alias, A)
+
+
+def test_deep_hierarchy_does_not_recurse():
+    cls = A
+    for i in range(sys.getrecursionlimit()):
+        cls = types.new_class(f"Deep{i}", (cls[T],))
+    assert resolve_typevars_mro(cls[int], A) == (int,)
+    with pytest.raises(RecursionError):
+        resolve_from_graph(cls[int], A)
+
+
+def test_unreachable_target_raises():
+    with pytest.raises(ValueError, match="failed to locate all typevars"):
+        resolve_typevars_mro(C[int], Left)
+
+
+def test_set_resolution_engine():
+    set_resolution_engine("mro")
+    try:
+
+        class Local[T](Diamond[T]): ...
+
+        assert get_resolved_typevars_for_base(Local[int], A) == (int,)
+    finally:
+        set_resolution_engine("graph")
+    with pytest.raises(ValueError, match="unknown resolution engine"):
+        set_resolution_engine("nope")
+
+
+@pytest.mark.parametrize("cls", CLASSES)
+@pytest.mark.parametrize("fallback", [False, True])
+def test_flat_plans_match_graph_plans(cls: type, fallback: bool):
+    targets = [
+        base
+        for base in cls.__mro__
+        if base is not typing.Generic and getattr(base, "__type_params__", None)
+    ]
+    assert flat_hierarchy.compile_plans(cls, targets, fallback) == (
+        GenericAliasNode.make(cls).compile_plans(targets, fallback)
+    )
+
+
+@pytest.mark.parametrize("engine", ["graph", "mro", "flat"])
+def test_fixed_values_pass_through_bounded_params(engine: str):
+    set_resolution_engine(engine)
+    try:
+        assert get_resolved_typevars_for_base(FixedThroughBound, BoundedTop) == (int,)
+        assert get_resolved_typevars_for_base(
+            FixedThroughBoundDefault, BoundedDefault
+        ) == (bool,)
+    finally:
+        set_resolution_engine("graph")
+
+
+def _plans_or_error(cls: type, targets: list[type]) -> object:
+    try:
+        return _compile_plans(cls, targets, False)
+    except ValueError:
+        return ValueError
+
+
+@pytest.mark.parametrize("cls", MEETING)
+def test_meeting_sources_fall_back_to_the_graph(cls: type):
+    targets = [Left, A]
+    with pytest.raises(_AmbiguousSourcesError):
+        compile_plans_mro(cls, targets)
+    with pytest.raises(_AmbiguousSourcesError):
+        flat_hierarchy.compile_plans(cls, targets)
+    expected = _plans_or_error(cls, targets)
+    for engine in ["mro", "flat"]:
+        set_resolution_engine(engine)
+        try:
+            assert _plans_or_error(cls, targets) == expected
+        finally:
+            set_resolution_engine("graph")
+
+
+def test_flat_hierarchy_layout():
+    flat = FlatHierarchy()
+    cid = flat.class_id(C)
+    b_id, a_id = flat.class_id(B), flat.class_id(A)
+    assert a_id < b_id < cid
+    assert flat.typevars[flat.slot_offsets[cid] : flat.slot_offsets[cid + 1]] == [
+        *C.__type_params__
+    ]
+    (edge,) = range(flat.base_offsets[cid], flat.base_offsets[cid + 1])
+    assert flat.base_class[edge] == b_id
+    fixed, linked = flat.arg_source[flat.arg_offsets[edge] : flat.arg_offsets[edge + 1]]
+    assert flat.constants[-2 - fixed] is str
+    assert linked == 0
+    with pytest.raises(ValueError, match="failed to locate all typevars"):
+        flat.compile_plans(C, [Left])
+
+
+def test_flat_hierarchy_drops_rows_of_collected_classes():
+    flat = FlatHierarchy()
+    refs = []
+    for i in range(50):
+
+        class Dyn: ...
+
+        class Local(A[Dyn]): ...
+
+        assert flat.compile_plans(Local, [A])[A].apply(()) == (Dyn,)
+        refs.append(weakref.ref(Dyn))
+        del Dyn, Local
+        if i % 10 == 9:
+            gc.collect()
+    # A[Dyn] is also held by typing's subscription cache
+    for cache_clear in typing._cleanups:  # type: ignore[attr-defined]
+        cache_clear()
+    flat.compile_plans(C, [A])
+    gc.collect()
+    assert len(flat.base_class) < 10
+    assert sum(ref() is not None for ref in refs) <= 2
+    flat.clear()
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+    assert len(flat) == 0
+
+
+def test_invalidate_clears_the_flat_hierarchy():
+    flat_hierarchy.class_id(C)
+    invalidate(__name__)
+    assert len(flat_hierarchy) == 0
+    assert flat_hierarchy.compile_plans(C, [A]) == (
+        GenericAliasNode.make(C).compile_plans([A])
+    )
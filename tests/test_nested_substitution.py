@@ -0,0 +1,131 @@
+import gc
+import typing
+import weakref
+from typing import Generic, NoDefault, TypeVar
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from pydantic import BaseModel
+
+from paramsight import get_resolved_typevars_for_base, resolution_cache
+from paramsight._substitution import free_typevars, substitution_cache
+
+TYPE_STRAT = st.sampled_from([int, float, str, bytes, bool])
+
+DEFAULT_SETTINGS = settings(max_examples=12, deadline=None)
+
+K = TypeVar("K")
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class Base[T]: ...
+
+
+class Pair[X, Y]: ...
+
+
+class Mid[U](Base[list[U]]): ...
+
+
+class Top[V](Mid[dict[str, V]]): ...
+
+
+class Wide[A, B](Pair[dict[A, B], Base[B]], Base[tuple[A, ...]]): ...
+
+
+class Old(Base[list[K]], Generic[K]): ...
+
+
+class Sub[T](BaseModel):
+    x: T
+
+
+class ModelMid[U](BaseModel, Base[Sub[U]]):
+    y: U
+
+
+class ModelTop(ModelMid[int]): ...
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def _nested(cls, target):
+    return get_resolved_typevars_for_base(cls, target, substitute_nested=True)
+
+
+@DEFAULT_SETTINGS
+@given(t=TYPE_STRAT)
+def test_substitutes_through_the_chain(t: type):
+    assert _nested(Mid[t], Base) == (list[t],)
+    assert _nested(Top[t], Mid) == (dict[str, t],)
+    assert _nested(Top[t], Base) == (list[dict[str, t]],)
+    assert _nested(Old[t], Base) == (list[t],)
+
+
+@DEFAULT_SETTINGS
+@given(t1=TYPE_STRAT, t2=TYPE_STRAT)
+def test_substitutes_several_params(t1: type, t2: type):
+    assert _nested(Wide[t1, t2], Pair) == (dict[t1, t2], Base[t2])
+    assert _nested(Wide[t1, t2], Base) == (tuple[t1, ...],)
+
+
+def test_pydantic_values_are_parametrized():
+    assert _nested(ModelMid[str], Base) == (Sub[str],)
+    assert _nested(ModelTop, Base) == (Sub[int],)
+
+
+def test_unresolved_params_stay_typevars():
+    (value,) = _nested(Top, Base)
+    (v,) = Top.__type_params__
+    assert value == list[dict[str, v]]
+    assert free_typevars(value) == (v,)
+    assert _nested(Mid, Mid) == (NoDefault,)
+
+
+def test_default_mode_is_unchanged():
+    (u,) = Mid.__type_params__
+    assert get_resolved_typevars_for_base(Mid[int], Base) == (list[u],)
+    # the two modes are cached separately
+    resolution_cache.clear()
+    get_resolved_typevars_for_base(Mid[int], Base)
+    _nested(Mid[int], Base)
+    assert resolution_cache.misses == 2
+
+
+def test_substitutions_are_memoized_per_owner():
+    substitution_cache.clear()
+    resolution_cache.clear()
+    _nested(Top[int], Base)
+    size = len(substitution_cache)
+    resolution_cache.clear()
+    _nested(Top[int], Base)
+    assert len(substitution_cache) == size > 0
+
+
+def test_substitutions_do_not_pin_arg_classes():
+    substitution_cache.clear()
+    substitution_cache.max_entries_per_class = 4
+    try:
+        refs = []
+        for _ in range(8):
+
+            class Dyn: ...
+
+            assert _nested(Top[Dyn], Base) == (list[dict[str, Dyn]],)
+            refs.append(weakref.ref(Dyn))
+            del Dyn
+        resolution_cache.clear()
+        # Top[Dyn] is also held by typing's subscription cache
+        for cache_clear in typing._cleanups:  # type: ignore[attr-defined]
+            cache_clear()
+        gc.collect()
+        assert [ref() is None for ref in refs] == [True] * 4 + [False] * 4
+    finally:
+        substitution_cache.max_entries_per_class = 256
+        substitution_cache.clear()
@@ -0,0 +1,154 @@
+import dataclasses
+import gc
+import weakref
+from typing import Literal, Optional
+
+from attrs import define
+from pydantic import BaseModel
+
+from paramsight import ParamIndex
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class Event: ...
+
+
+class Click(Event): ...
+
+
+class DoubleClick(Click): ...
+
+
+class Handler[T]: ...
+
+
+class ClickHandler(Handler[Click]): ...
+
+
+class EventHandler(Handler[Event]): ...
+
+
+class Generic2[K, V](Handler[V]): ...
+
+
+class Mid[U](Handler[list[U]]): ...
+
+
+class IntH(Mid[int]): ...
+
+
+class M[T](BaseModel):
+    field: T
+
+
+MInt = M[int]
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_existing_subclasses_are_indexed():
+    index = ParamIndex(Handler)
+    assert index.exact(Click) == [ClickHandler]
+    assert index.exact(Handler[Event]) == [EventHandler]
+    assert index.exact(int) == []
+
+
+def test_new_subclasses_are_indexed_on_creation():
+    index = ParamIndex(Handler)
+
+    class DoubleClickHandler(Handler[DoubleClick]): ...
+
+    class StrHandler(Generic2[int, str]): ...
+
+    class Deeper(StrHandler): ...
+
+    assert index.exact(DoubleClick) == [DoubleClickHandler]
+    assert set(index.exact(str)) == {StrHandler, Deeper}
+
+
+def test_subclass_matching():
+    gc.collect()  # drop the local handlers of other tests
+    index = ParamIndex(Handler)
+
+    class DoubleClickHandler(Handler[DoubleClick]): ...
+
+    assert set(index.matching(Click)) == {ClickHandler, DoubleClickHandler}
+    assert set(index.matching(Event)) == {
+        ClickHandler,
+        EventHandler,
+        DoubleClickHandler,
+    }
+    assert index.matching(DoubleClick) == [DoubleClickHandler]
+
+
+def test_index_does_not_pin_classes():
+    index = ParamIndex(Handler)
+
+    class Local(Handler[bytes]): ...
+
+    ref = weakref.ref(Local)
+    assert index.exact(bytes) == [Local]
+    del Local
+    gc.collect()
+    assert ref() is None
+    assert index.exact(bytes) == []
+
+
+def test_dropped_index_stops_listening():
+    index = ParamIndex(Handler)
+    ref = weakref.ref(index)
+    del index
+    gc.collect()
+    assert ref() is None
+
+    class AfterDrop(Handler[float]): ...
+
+    assert ParamIndex(Handler).exact(float) == [AfterDrop]
+
+
+def test_pydantic_base_is_indexed_by_refresh():
+    index = ParamIndex(M)
+    assert index.exact(int) == [MInt]
+
+    class IntModel(M[bytes]): ...
+
+    index.refresh()
+    assert IntModel in index.exact(bytes)
+
+
+def test_nested_params_are_substituted():
+    index = ParamIndex(Handler)
+    assert index.exact(list[int]) == [IntH]
+    assert index.exact(Handler[list[int]]) == [IntH]
+
+
+def test_rebuilt_classes_are_indexed_once():
+    index = ParamIndex(Handler)
+
+    @define
+    class Slotted(Handler[complex]):
+        x: int = 0
+
+    @dataclasses.dataclass(slots=True)
+    class DC(Handler[complex]):
+        x: int = 0
+
+    assert index.exact(complex) == [Slotted, DC]
+    assert ParamIndex(Handler).exact(complex) == [Slotted, DC]
+
+
+def test_matching_skips_special_forms():
+    class OptionalHandler(Handler[Optional[int]]): ...  # noqa: UP045
+
+    class LiteralHandler(Handler[Literal[1]]): ...
+
+    index = ParamIndex(Handler)
+    assert index.matching(int) == []
+    assert index.exact(Literal[1]) == [LiteralHandler]
+    assert index.exact(Optional[int]) == [OptionalHandler]  # noqa: UP045
@@ -0,0 +1,134 @@
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from pydantic import BaseModel
+from resolvers import resolve_from_graph
+
+from paramsight import (
+    get_parameter_map,
+    get_resolution_plan,
+    get_resolved_typevars_for_base,
+    plan_cache,
+    precompute_params,
+    takes_alias,
+)
+
+TYPE_STRAT = st.sampled_from([int, float, str, bytes, bool])
+
+DEFAULT_SETTINGS = settings(max_examples=12, deadline=None)
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class A[T]: ...
+
+
+@precompute_params
+class Base[X, Y](A[Y]):
+    @takes_alias
+    @classmethod
+    def check(cls):
+        return get_resolved_typevars_for_base(cls, A)
+
+
+class Sub[Z](Base[str, Z]): ...
+
+
+class SubSub(Sub[bytes]): ...
+
+
+@precompute_params
+class Plain[T](A[T]): ...
+
+
+class WithInitSubclass[T](Plain[T]):
+    seen: list[type] = []
+
+    def __init_subclass__(cls, **kw):
+        super().__init_subclass__(**kw)
+        WithInitSubclass.seen.append(cls)
+
+
+class AfterInitSubclass[T](WithInitSubclass[T]): ...
+
+
+@precompute_params
+class Model[T](BaseModel, A[T]):
+    field: T
+
+
+class SubModel[T](Model[list[T]]): ...
+
+
+class Left[T](A[T]): ...
+
+
+class Mixed[K, V](Left[K], Sub[K]): ...
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_tables_are_attached_to_decorated_classes_and_subclasses():
+    assert set(Base.__dict__["__paramsight_table__"]) == {Base, A}
+    assert set(Sub.__dict__["__paramsight_table__"]) == {Sub, Base, A}
+    assert set(SubSub.__dict__["__paramsight_table__"]) == {Sub, Base, A}
+    assert set(SubModel.__dict__["__paramsight_table__"]) == {SubModel, Model, A}
+    assert "__paramsight_table__" not in Model[int].__dict__
+    assert AfterInitSubclass in WithInitSubclass.seen
+    assert "__paramsight_table__" in AfterInitSubclass.__dict__
+
+
+def test_table_plans_are_used_for_resolution():
+    plan_cache.clear()
+    table = Sub.__dict__["__paramsight_table__"]
+    assert get_resolution_plan(Sub[int], A) is table[A]
+    assert len(plan_cache) == 0
+
+
+@DEFAULT_SETTINGS
+@given(t=TYPE_STRAT)
+def test_table_resolution_matches_graph(t: type):
+    assert Sub[t].check() == (t,) == resolve_from_graph(Sub[t], A)
+    assert get_resolved_typevars_for_base(Sub[t], Base) == (str, t)
+    assert SubSub.check() == (bytes,)
+    assert get_resolved_typevars_for_base(SubModel[t], SubModel) == (t,)
+    assert get_resolved_typevars_for_base(Model[t], A) == (t,)
+
+
+@DEFAULT_SETTINGS
+@given(t1=TYPE_STRAT, t2=TYPE_STRAT)
+def test_parameter_map_covers_every_ancestor(t1: type, t2: type):
+    params = get_parameter_map(Mixed[t1, t2])
+    assert list(params) == [Mixed, Left, Sub, Base, A]
+    assert params == {
+        Mixed: (t1, t2),
+        Left: (t1,),
+        Sub: (t1,),
+        Base: (str, t1),
+        A: (t1,),
+    }
+    for ancestor, resolved in params.items():
+        assert get_resolved_typevars_for_base(Mixed[t1, t2], ancestor) == resolved
+    assert get_parameter_map(Model[t1]) == {Model: (t1,), A: (t1,)}
+
+
+@DEFAULT_SETTINGS
+@given(t=TYPE_STRAT)
+def test_parameter_map_substitutes_nested(t: type):
+    (u,) = SubModel.__type_params__
+    assert get_parameter_map(SubModel[t])[Model] == (list[u],)
+    assert get_parameter_map(SubModel[t], substitute_nested=True) == {
+        SubModel: (t,),
+        Model: (list[t],),
+        A: (list[t],),
+    }
+
+
+def test_parameter_map_uses_tables():
+    plan_cache.clear()
+    assert get_parameter_map(SubSub) == {Sub: (bytes,), Base: (str, bytes), A: (bytes,)}
+    assert len(plan_cache) == 0
@@ -0,0 +1,106 @@
+import importlib
+import sys
+import textwrap
+
+import pytest
+
+from paramsight import (
+    get_resolved_typevars_for_base,
+    get_resolved_typevars_for_base_inst,
+    plan_cache,
+    prewarm,
+    resolution_cache,
+)
+from paramsight._param_table import _generic_ancestors
+
+PACKAGE = "paramsight_prewarm_target"
+
+INIT = """
+from paramsight import takes_alias, get_resolved_typevars_for_base
+
+
+class Base[T]: ...
+
+
+class WithAlias[T](Base[T]):
+    @takes_alias
+    @classmethod
+    def resolved(cls):
+        return get_resolved_typevars_for_base(cls, Base)
+
+
+class NotGeneric: ...
+"""
+
+SUB = """
+from paramsight_prewarm_target import Base
+
+
+class Other[K, V](Base[V]): ...
+
+
+class Fixed(Other[int, str]):
+    class Nested[T](Base[T]): ...
+"""
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    root = tmp_path / PACKAGE
+    root.mkdir()
+    (root / "__init__.py").write_text(textwrap.dedent(INIT))
+    (root / "sub.py").write_text(textwrap.dedent(SUB))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    importlib.invalidate_caches()
+    plan_cache.clear()
+    resolution_cache.clear()
+    yield
+    for name in list(sys.modules):
+        if name.startswith(PACKAGE):
+            del sys.modules[name]
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_prewarm_walks_package(package, workers: int):
+    warmed = prewarm(PACKAGE, workers=workers)
+    pkg = sys.modules[PACKAGE]
+    sub = sys.modules[f"{PACKAGE}.sub"]
+    assert set(warmed) == {
+        pkg.Base,
+        pkg.WithAlias,
+        sub.Other,
+        sub.Fixed,
+        sub.Fixed.Nested,
+    }
+    for cls in warmed:
+        for ancestor in _generic_ancestors(cls):
+            assert plan_cache.get(cls, ancestor, False) is not None
+    assert pkg.WithAlias[int].resolved() == (int,)
+
+
+def test_prewarm_caches_resolutions(package):
+    prewarm(PACKAGE)
+    pkg = sys.modules[PACKAGE]
+    sub = sys.modules[f"{PACKAGE}.sub"]
+    misses = resolution_cache.misses
+    assert get_resolved_typevars_for_base(sub.Fixed, sub.Other) == (int, str)
+    assert get_resolved_typevars_for_base_inst(sub.Fixed(), pkg.Base) == (str,)
+    assert resolution_cache.misses == misses
+
+
+def test_prewarm_only_given_targets(package):
+    pkg = importlib.import_module(PACKAGE)
+    sub = importlib.import_module(f"{PACKAGE}.sub")
+    prewarm([pkg, sub], targets=[pkg.Base])
+    assert len(plan_cache) == 5
+    assert plan_cache.get(sub.Fixed, pkg.Base, False) is not None
+    assert plan_cache.get(sub.Fixed, sub.Other, False) is None
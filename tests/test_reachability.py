@@ -0,0 +1,82 @@
+import gc
+import weakref
+
+import pytest
+from pydantic import BaseModel
+
+from paramsight import (
+    get_resolved_typevars_for_base,
+    set_resolution_engine,
+    try_resolve,
+)
+from paramsight._paramsight import _typenode_registry
+from paramsight._reachability import reachability_index
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class A[T]: ...
+
+
+class B[X, Y](A[Y]): ...
+
+
+class C[Z](B[str, Z]): ...
+
+
+class Unrelated[T]: ...
+
+
+class NotGeneric: ...
+
+
+class M[T](BaseModel, A[T]):
+    field: T
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_index_holds_ancestors():
+    assert reachability_index.ancestors(C) == frozenset(C.__mro__[1:])
+    assert reachability_index.reaches(C, C)
+    assert reachability_index.reaches(C, A)
+    assert not reachability_index.reaches(A, C)
+    assert reachability_index.reaches_any(C, [Unrelated, B])
+    assert not reachability_index.reaches_any(C, [Unrelated, NotGeneric])
+
+
+def test_index_does_not_pin_classes():
+    class Local(A[int]): ...
+
+    ref = weakref.ref(Local)
+    assert reachability_index.reaches(Local, A)
+    del Local
+    gc.collect()
+    assert ref() is None
+
+
+@pytest.mark.parametrize("engine", ["graph", "mro", "flat"])
+def test_try_resolve(engine: str):
+    set_resolution_engine(engine)
+    try:
+        assert try_resolve(C[int], A) == (int,)
+        assert try_resolve(M[int], A) == (int,)
+        assert try_resolve(C[int], Unrelated) is None
+        assert try_resolve(C, NotGeneric) is None
+        assert try_resolve(NotGeneric, A) is None
+    finally:
+        set_resolution_engine("graph")
+
+
+def test_unreachable_target_fails_without_walking_the_hierarchy():
+    class Fresh[T](C[T]): ...
+
+    with pytest.raises(ValueError, match="not an ancestor"):
+        get_resolved_typevars_for_base(Fresh[int], Unrelated)
+    assert try_resolve(Fresh[int], Unrelated) is None
+    assert Fresh not in _typenode_registry
@@ -0,0 +1,230 @@
+import gc
+import types
+import typing
+import weakref
+from typing import Annotated, NoDefault
+
+import pytest
+from pydantic import BaseModel
+
+from paramsight import (
+    aliasclassmethod,
+    get_resolved_typevars_for_base,
+    get_resolved_typevars_for_base_inst,
+    resolution_cache,
+    resolve_many_inst,
+    takes_alias,
+)
+from paramsight.type_utils import specialization_key
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class A[T]: ...
+
+
+class B[X, Y](A[Y]): ...
+
+
+class C[Z](B[str, Z]): ...
+
+
+class M[T](BaseModel):
+    field: T
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_repeated_resolution_hits_cache():
+    resolution_cache.clear()
+    assert get_resolved_typevars_for_base(C[int], A) == (int,)
+    assert (resolution_cache.hits, resolution_cache.misses) == (0, 1)
+    assert get_resolved_typevars_for_base(C[int], A) == (int,)
+    assert (resolution_cache.hits, resolution_cache.misses) == (1, 1)
+    assert get_resolved_typevars_for_base(C[int], B) == (str, int)
+    assert get_resolved_typevars_for_base(C[float], A) == (float,)
+    assert resolution_cache.misses == 3
+
+
+def test_return_bound_as_fallback_is_part_of_the_key():
+    resolution_cache.clear()
+    get_resolved_typevars_for_base(C, A)
+    get_resolved_typevars_for_base(C, A, return_bound_as_fallback=True)
+    assert resolution_cache.misses == 2
+
+
+def test_clear_resets_entries_and_counters():
+    get_resolved_typevars_for_base(C[int], A)
+    resolution_cache.clear()
+    assert len(resolution_cache) == 0
+    assert (resolution_cache.hits, resolution_cache.misses) == (0, 0)
+
+
+def test_cache_does_not_pin_dynamic_classes():
+    resolution_cache.clear()
+
+    # subscripting would pin these through typing's / pydantic's own caches
+    class Local(A[int]): ...
+
+    class LocalModel(M[int]): ...
+
+    assert get_resolved_typevars_for_base(Local, A) == (int,)
+    assert get_resolved_typevars_for_base(LocalModel, M) == (int,)
+    refs = [weakref.ref(Local), weakref.ref(LocalModel)]
+    assert len(resolution_cache) == 2
+    del Local, LocalModel
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+    assert len(resolution_cache) == 0
+
+
+def test_cache_does_not_pin_arg_classes():
+    resolution_cache.clear()
+    resolution_cache.max_entries_per_class = 4
+    try:
+        refs = []
+        for _ in range(8):
+
+            class Dyn: ...
+
+            assert get_resolved_typevars_for_base(C[Dyn], A) == (Dyn,)
+            refs.append(weakref.ref(Dyn))
+            del Dyn
+        assert len(resolution_cache) == 4
+        # C[Dyn] is also held by typing's subscription cache
+        for cache_clear in typing._cleanups:  # type: ignore[attr-defined]
+            cache_clear()
+        gc.collect()
+        assert [ref() is None for ref in refs] == [True] * 4 + [False] * 4
+    finally:
+        resolution_cache.max_entries_per_class = 256
+        resolution_cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# Instances
+# ---------------------------------------------------------------------------
+
+
+class IntC(C[int]): ...
+
+
+def test_instance_of_plain_class_hits_class_table():
+    resolution_cache.clear()
+    inst = IntC()
+    assert get_resolved_typevars_for_base_inst(inst, A) == (int,)
+    assert get_resolved_typevars_for_base_inst(inst, A) == (int,)
+    assert get_resolved_typevars_for_base_inst(IntC(), B) == (str, int)
+    assert (resolution_cache.hits, resolution_cache.misses) == (1, 2)
+
+
+def test_instance_uses_orig_class():
+    assert get_resolved_typevars_for_base_inst(C[float](), A) == (float,)
+    assert get_resolved_typevars_for_base_inst(C(), B) == (str, NoDefault)
+    assert get_resolved_typevars_for_base_inst(M[int](field=1), M) == (int,)
+
+
+def test_resolve_many_inst_groups_by_alias():
+    resolution_cache.clear()
+    insts = [C[int](), IntC(), C[int](), IntC(), C[bytes](), M[str](field="")]
+    assert resolve_many_inst(insts[:5], A) == [
+        (int,),
+        (int,),
+        (int,),
+        (int,),
+        (bytes,),
+    ]
+    # one resolution per distinct alias
+    assert resolution_cache.misses == 3
+    assert resolve_many_inst(insts[5:], M) == [(str,)]
+
+
+def test_instance_table_does_not_pin_classes():
+    resolution_cache.clear()
+
+    class Local(A[int]): ...
+
+    ref = weakref.ref(Local)
+    assert get_resolved_typevars_for_base_inst(Local(), A) == (int,)
+    del Local
+    gc.collect()
+    assert ref() is None
+
+
+# ---------------------------------------------------------------------------
+# Specialization keys
+# ---------------------------------------------------------------------------
+
+
+class Checked[T]:
+    @takes_alias
+    @classmethod
+    def param(cls):
+        return get_resolved_typevars_for_base(cls, Checked)[0]
+
+
+def test_specialization_key_is_shared_across_alias_forms():
+    raw = typing._GenericAlias(Checked, (int,))  # type: ignore[attr-defined]
+    proxy = Checked[int]
+    assert type(proxy) is not type(raw)
+    assert specialization_key(raw) == specialization_key(proxy) == (Checked, (int,))
+    assert specialization_key(A[int]) == (A, (int,))
+    assert specialization_key(M[int]) == (M, (int,))
+    assert specialization_key(M) == (M, ())
+    assert specialization_key(IntC) == (IntC, ())
+
+
+def test_alias_forms_share_cache_entries():
+    resolution_cache.clear()
+    raw = typing._GenericAlias(Checked, (int,))  # type: ignore[attr-defined]
+    assert get_resolved_typevars_for_base(raw, Checked) == (int,)
+    assert Checked[int].param() is int
+    assert (resolution_cache.hits, resolution_cache.misses) == (1, 1)
+
+
+def test_subscription_reuses_proxies():
+    assert Checked[int] is Checked[int]
+    assert Checked[int] is not Checked[str]
+    assert Checked[Annotated[int, []]].param() == Annotated[int, []]
+
+
+class Lit[T]:
+    # uncached, unlike Generic's, which already merges Lit[1] and Lit[True]
+    def __class_getitem__(cls, item):
+        return typing._GenericAlias(cls, item)  # type: ignore[attr-defined]
+
+    @takes_alias
+    @classmethod
+    def param(cls):
+        return get_resolved_typevars_for_base(cls, Lit)[0]
+
+
+def test_equal_args_of_different_types_get_their_own_entries():
+    resolution_cache.clear()
+    assert Lit[1].param() == 1
+    assert Lit[True].__args__[0] is True
+    assert Lit[True].param() is True
+    assert get_resolved_typevars_for_base(types.GenericAlias(A, 1), A)[0] == 1
+    assert get_resolved_typevars_for_base(types.GenericAlias(A, True), A)[0] is True
+
+
+def test_proxy_cache_does_not_pin_arg_classes(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(aliasclassmethod, "_PROXY_CACHE_SIZE", 4)
+    refs = []
+    for _ in range(8):
+
+        class Dyn: ...
+
+        assert Checked[Dyn] is Checked[Dyn]
+        refs.append(weakref.ref(Dyn))
+        del Dyn
+    assert len(Checked.__dict__["_ga_proxy_cache__"]) == 4
+    for cache_clear in typing._cleanups:  # type: ignore[attr-defined]
+        cache_clear()
+    gc.collect()
+    assert [ref() is None for ref in refs] == [True] * 4 + [False] * 4
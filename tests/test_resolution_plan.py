@@ -0,0 +1,132 @@
+import typing
+from typing import Generic, TypeVar
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from pydantic import BaseModel
+from resolvers import resolve_from_graph
+
+from paramsight import (
+    PlanEntry,
+    get_resolution_plan,
+    get_resolution_plans,
+    get_resolved_typevars_for_bases,
+    resolve_many,
+)
+from paramsight.type_utils import get_args_robust
+
+TYPE_STRAT = st.sampled_from([int, float, str, bytes, bool])
+
+DEFAULT_SETTINGS = settings(max_examples=12, deadline=None)
+
+S = TypeVar("S", bound=int)
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class A[T]: ...
+
+
+class B[X, Y](A[Y]): ...
+
+
+class C[Z](B[str, Z]): ...
+
+
+class Defaults[T, U = bytes](B[U, T]): ...
+
+
+class Bounded(A[S], Generic[S]): ...
+
+
+class M[T](BaseModel, A[T]):
+    field: T
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_plan_entries_describe_the_hierarchy():
+    assert get_resolution_plan(C, B).entries == (
+        PlanEntry("fixed", str, fixed_at=0),
+        PlanEntry("default", typing.NoDefault, arg_index=0),
+    )
+    assert get_resolution_plan(Defaults, B).entries == (
+        PlanEntry("default", bytes, arg_index=1),
+        PlanEntry("default", typing.NoDefault, arg_index=0),
+    )
+
+
+def test_plan_is_shared_between_aliases_of_the_same_origin():
+    assert get_resolution_plan(C[int], A) is get_resolution_plan(C[str], A)
+    assert get_resolution_plan(C, A) is get_resolution_plan(C[str], A)
+
+
+@DEFAULT_SETTINGS
+@given(t1=TYPE_STRAT, t2=TYPE_STRAT)
+def test_plan_matches_graph_resolution(t1: type, t2: type):
+    cases = [
+        (C[t1], A),
+        (C[t1], B),
+        (C, B),
+        (Defaults[t1, t2], B),
+        (Defaults[t1], A),
+        (Defaults, A),
+        (Bounded, A),
+        (M[t1], A),
+        (M, M),
+    ]
+    for cls, base in cases:
+        for fallback in (False, True):
+            plan = get_resolution_plan(cls, base, fallback)
+            assert plan.apply(get_args_robust(cls)) == resolve_from_graph(
+                cls, base, fallback
+            )
+
+
+class Storage[T]: ...
+
+
+class Codec[T]: ...
+
+
+class Config[K, V]: ...
+
+
+class Service[X, Y](Storage[X], Codec[Y], Config[str, X], C[Y]): ...
+
+
+@DEFAULT_SETTINGS
+@given(t1=TYPE_STRAT, t2=TYPE_STRAT)
+def test_multi_base_resolution_matches_single_base(t1: type, t2: type):
+    bases = [Storage, Codec, Config, A, B, C, Service]
+    resolved = get_resolved_typevars_for_bases(Service[t1, t2], bases)
+    assert list(resolved) == bases
+    for base in bases:
+        assert resolved[base] == resolve_from_graph(Service[t1, t2], base)
+    assert resolved[Config] == (str, t1)
+
+
+def test_multi_base_plans_compile_in_one_call():
+    class Local[X, Y](Service[Y, X]): ...
+
+    plans = get_resolution_plans(Local, [A, Codec, Storage])
+    assert plans[Codec] is get_resolution_plan(Local, Codec)
+    assert plans[A].apply((int, str)) == (int,)
+
+
+@DEFAULT_SETTINGS
+@given(ts=st.lists(st.tuples(TYPE_STRAT, TYPE_STRAT), max_size=20))
+def test_resolve_many_matches_one_by_one_in_input_order(ts: list[tuple[type, type]]):
+    aliases = [
+        alias
+        for t1, t2 in ts
+        for alias in (C[t1], Defaults[t1, t2], Service[t2, t1], M[t1], C)
+    ]
+    assert resolve_many(aliases, A) == [
+        resolve_from_graph(alias, A) for alias in aliases
+    ]
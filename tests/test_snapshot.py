@@ -0,0 +1,218 @@
+import importlib
+import sys
+import textwrap
+
+import pytest
+
+from paramsight import (
+    get_resolution_plan,
+    get_resolved_typevars_for_base,
+    invalidate,
+    load_snapshot,
+    plan_cache,
+    resolution_cache,
+    save_snapshot,
+)
+from paramsight._fingerprint import _module_hashes
+from paramsight._param_table import build_param_table
+from paramsight._snapshot import PlanSnapshot
+
+SOURCE = """
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+K = TypeVar("K")
+
+
+class Base[T]: ...
+
+
+class Pair[X, Y = bytes](Base[Y]): ...
+
+
+class Mid[U](Pair[list[U], tuple[U, ...]]): ...
+
+
+class Fixed(Mid[{arg}]): ...
+
+
+class Old(Base[dict[str, K]], Generic[K]): ...
+
+
+class Model[T](BaseModel, Base[T]):
+    x: T
+
+
+class Outer:
+    class Nested[T](Base[T]): ...
+
+
+def factory():
+    class Local[T](Base[T]): ...
+
+    return Local
+
+
+Local = factory()
+"""
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def module(tmp_path, monkeypatch):
+    name = "paramsight_snapshot_target"
+    path = tmp_path / f"{name}.py"
+
+    def write(arg: str):
+        path.write_text(textwrap.dedent(SOURCE.format(arg=arg)))
+        importlib.invalidate_caches()
+        # a fresh process would hash the source again
+        _module_hashes.pop(name, None)
+
+    write("int")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    mod = importlib.import_module(name)
+    mod.write = write
+    yield mod
+    plan_cache.use_snapshot(None)
+    plan_cache.clear()
+    sys.modules.pop(name, None)
+
+
+def _fresh_caches():
+    plan_cache.clear()
+    resolution_cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_snapshot_round_trips_plans(module, tmp_path):
+    path = tmp_path / "plans.bin"
+    written = save_snapshot(path, [module])
+    # Local can't be found again by its qualname
+    assert written == 7
+    tables = {
+        cls: build_param_table(cls)
+        for cls in (module.Mid, module.Fixed, module.Old, module.Outer.Nested)
+    }
+
+    _fresh_caches()
+    snapshot = load_snapshot(path)
+    assert snapshot.compatible
+    assert len(snapshot) == 7
+    for cls, table in tables.items():
+        for target_base, plan in table.items():
+            assert get_resolution_plan(cls, target_base) == plan
+    assert snapshot.loaded == 4
+    assert get_resolved_typevars_for_base(
+        module.Mid[int], module.Pair, substitute_nested=True
+    ) == (list[int], tuple[int, ...])
+    assert get_resolved_typevars_for_base(
+        module.Fixed, module.Base, substitute_nested=True
+    ) == (tuple[int, ...],)
+    assert get_resolved_typevars_for_base(module.Model[str], module.Base) == (str,)
+    assert get_resolved_typevars_for_base(module.Local[int], module.Base) == (int,)
+    snapshot.close()
+
+
+def test_changed_source_falls_back_to_live_compilation(module, tmp_path):
+    path = tmp_path / "plans.bin"
+    save_snapshot(path, [module.Fixed])
+    module.write("str")
+    module = importlib.reload(module)
+
+    _fresh_caches()
+    snapshot = load_snapshot(path)
+    assert get_resolved_typevars_for_base(module.Fixed, module.Mid) == (str,)
+    assert snapshot.loaded == 0
+    snapshot.close()
+
+
+def test_reload_and_invalidate_rehash_the_source(module, tmp_path):
+    path = tmp_path / "plans.bin"
+    save_snapshot(path, [module.Fixed])
+    _fresh_caches()
+    snapshot = load_snapshot(path)
+    assert get_resolved_typevars_for_base(module.Fixed, module.Mid) == (int,)
+    assert snapshot.loaded == 1
+
+    # edited in this process: the hash computed for the snapshot is stale
+    source = module.__file__
+    with open(source) as f:
+        text = f.read()
+    with open(source, "w") as f:
+        f.write(text.replace("class Fixed(Mid[int])", "class Fixed(Mid[str])"))
+    importlib.invalidate_caches()
+    module = importlib.reload(module)
+    invalidate(module)
+
+    assert get_resolved_typevars_for_base(module.Fixed, module.Mid) == (str,)
+    assert snapshot.loaded == 1
+    snapshot.close()
+
+
+def test_other_platform_is_ignored(module, tmp_path, monkeypatch):
+    path = tmp_path / "plans.bin"
+    monkeypatch.setattr("paramsight._snapshot._platform_tag", lambda: "other")
+    save_snapshot(path, [module])
+    monkeypatch.undo()
+
+    snapshot = PlanSnapshot(path)
+    assert not snapshot.compatible
+    assert snapshot.plans_for(module.Fixed) is None
+    snapshot.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "plans.bin"
+    path.write_bytes(b"not a snapshot at all")
+    with pytest.raises(ValueError, match="not a paramsight snapshot"):
+        PlanSnapshot(path)
+
+
+def test_truncated_snapshot_falls_back_to_live_compilation(module, tmp_path):
+    path = tmp_path / "plans.bin"
+    save_snapshot(path, [module])
+    data = path.read_bytes()
+    for size in range(0, len(data), 7):
+        path.write_bytes(data[:size])
+        snapshot = PlanSnapshot(path)
+        assert not snapshot.compatible
+        assert len(snapshot) == 0
+        assert snapshot.plans_for(module.Fixed) is None
+        snapshot.close()
+
+
+def test_saving_over_a_loaded_snapshot_keeps_it_readable(module, tmp_path):
+    path = tmp_path / "plans.bin"
+    save_snapshot(path, [module.Fixed])
+    _fresh_caches()
+    snapshot = load_snapshot(path)
+    save_snapshot(path, [module])
+    # no temporary file is left behind
+    assert not list(tmp_path.glob(".plans.bin.*"))
+    assert get_resolved_typevars_for_base(module.Fixed, module.Mid) == (int,)
+    assert snapshot.loaded == 1
+    snapshot.close()
+    assert len(PlanSnapshot(path)) == 7
+
+
+def test_closed_snapshot_is_detached(module, tmp_path):
+    path = tmp_path / "plans.bin"
+    save_snapshot(path, [module])
+    _fresh_caches()
+    snapshot = load_snapshot(path)
+    snapshot.close()
+    assert snapshot.plans_for(module.Fixed) is None
+    assert get_resolved_typevars_for_base(
+        module.Mid[int], module.Pair, substitute_nested=True
+    ) == (list[int], tuple[int, ...])
+    assert snapshot.loaded == 0
+    snapshot.close()
@@ -0,0 +1,157 @@
+import gc
+import typing
+import weakref
+from typing import Generic, TypeVar
+
+import pytest
+
+from paramsight import resolution_cache, specialize, takes_alias
+from paramsight._alias_cache import variant_cache
+
+S = TypeVar("S")
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class Base[T]:
+    @takes_alias
+    @classmethod
+    @specialize
+    def zero(cls):
+        return T(0)
+
+    @specialize
+    def convert(self, value):
+        return T(value)
+
+    @specialize
+    def nested(self, values):
+        return [(lambda v: T(v))(v) for v in values]
+
+    @takes_alias
+    @classmethod
+    @specialize
+    def one(cls, *args: T, scale: T = 1, **kwargs: T) -> T:
+        return T(scale)
+
+
+class Sub[U](Base[U]):
+    @specialize
+    def describe(self):
+        # closes over both U and __class__
+        return (U, super().convert(1))
+
+
+class IntSub(Sub[int]): ...
+
+
+class Pair[A, B]:
+    @takes_alias
+    @classmethod
+    @specialize
+    def kinds(cls):
+        return (A, B)
+
+    @specialize
+    def inst(self):
+        return (A, B)
+
+
+class Half[X](Pair[X, int]): ...
+
+
+class OldStyle(Generic[S]):
+    @takes_alias
+    @classmethod
+    @specialize
+    def param(cls):
+        return S
+
+    @specialize
+    def get(self):
+        return S
+
+
+class OldSub(OldStyle[int], Generic[S]): ...
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_takes_alias_methods_see_resolved_params():
+    assert Base[int].zero() == 0
+    assert type(Base[float].zero()) is float
+    assert IntSub.zero() == 0
+    assert OldStyle[str].param() is str
+
+
+def test_instance_methods_use_orig_class():
+    assert Base[int]().convert("3") == 3
+    assert Base[str]().convert(3) == "3"
+    assert IntSub().convert("4") == 4
+    assert Base[int]().nested(["1", "2"]) == [1, 2]
+
+
+def test_super_and_own_params():
+    assert Sub[float]().describe() == (float, 1.0)
+    assert IntSub().describe() == (int, 1)
+
+
+def test_unresolved_params_keep_their_typevar():
+    (t,) = Base.__type_params__
+    with pytest.raises(TypeError, match="TypeVar"):
+        Base.zero()
+    assert OldStyle.param() is S
+    assert t.__name__ == "T"
+
+
+def test_variants_are_cached_per_alias():
+    variant_cache.clear()
+    assert Base[int].zero() == 0
+    assert Base[int].zero() == 0
+    assert Base[float].zero() == 0.0
+    assert len(variant_cache) == 2
+
+
+def test_params_resolve_on_the_defining_class():
+    # OldSub reuses S for its own parameter
+    assert OldSub[str].param() is int
+    assert OldSub[str]().get() is int
+    assert OldStyle[str]().get() is str
+
+
+def test_variants_do_not_pin_classes():
+    variant_cache.clear()
+    refs = []
+    for _ in range(4):
+
+        class Dyn: ...
+
+        assert Base[Dyn]().convert.__name__ == "convert"
+        assert type(Base[Dyn]().nested([])) is list
+        refs.append(weakref.ref(Dyn))
+        del Dyn
+    variant_cache.clear()
+    resolution_cache.clear()
+    Base.__dict__["_ga_proxy_cache__"].clear()
+    for cache_clear in typing._cleanups:  # type: ignore[attr-defined]
+        cache_clear()
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+
+
+def test_partially_resolved_params():
+    a, _ = Pair.__type_params__
+    assert Half.kinds() == (a, int)
+    assert Half().inst() == (a, int)
+    assert Half[str].kinds() == (str, int)
+
+
+def test_annotated_methods():
+    (t,) = Base.__type_params__
+    assert type(Base[float].one()) is float
+    assert Base[float].one.__annotations__["return"] is t
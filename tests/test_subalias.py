@@ -0,0 +1,128 @@
+import gc
+import typing
+import weakref
+from typing import Any
+
+from pydantic import BaseModel
+
+from paramsight import is_instance_of, is_subalias, resolution_cache
+from paramsight._alias_cache import subalias_cache
+from paramsight._substitution import substitution_cache
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class Container[T]: ...
+
+
+class Pair[K, V](Container[V]): ...
+
+
+class IntBox(Container[int]): ...
+
+
+class Unrelated[T]: ...
+
+
+class Mid[U](Container[list[U]]): ...
+
+
+class Top[V](Mid[V]): ...
+
+
+class M[T](BaseModel, Container[T]):
+    field: T
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_is_subalias_compares_resolved_args():
+    assert is_subalias(Container[int], Container[int])
+    assert not is_subalias(Container[int], Container[str])
+    assert is_subalias(Pair[str, int], Container[int])
+    assert not is_subalias(Pair[int, str], Container[int])
+    assert is_subalias(IntBox, Container[int])
+    assert is_subalias(M[int], Container[int])
+    assert is_subalias(M[int], M[int])
+    assert not is_subalias(M[int], M[str])
+
+
+def test_nested_params_are_substituted():
+    assert is_subalias(Mid[int], Container[list[int]])
+    assert is_subalias(Top[int], Container[list[int]])
+    assert not is_subalias(Top[int], Container[list[str]])
+    assert is_instance_of(Top[int](), Container[list[int]])
+
+
+def test_plain_targets_and_any():
+    assert is_subalias(Pair[str, int], Container)
+    assert is_subalias(Pair[str, int], Pair[Any, int])
+    assert not is_subalias(Pair[str, int], Pair[Any, str])
+    assert not is_subalias(Container[int], Unrelated[int])
+    assert not is_subalias(Container[int], Unrelated)
+
+
+def test_unspecialized_classes_do_not_match_specializations():
+    assert is_subalias(Container, Container)
+    assert not is_subalias(Container, Container[int])
+
+
+def test_is_instance_of():
+    assert is_instance_of(Container[int](), Container[int])
+    assert not is_instance_of(Container[str](), Container[int])
+    assert is_instance_of(IntBox(), Container[int])
+    assert is_instance_of(Pair[str, bytes](), Container[bytes])
+    assert is_instance_of(M[int](field=1), Container[int])
+    assert not is_instance_of(M[str](field=""), Container[int])
+    assert not is_instance_of(Container(), Container[int])
+    assert not is_instance_of(1, Container[int])
+
+
+def test_checks_are_cached():
+    subalias_cache.clear()
+    assert is_instance_of(IntBox(), Container[int])
+    assert is_subalias(Pair[str, int], Container[int])
+    assert len(subalias_cache) == 2
+    assert is_instance_of(IntBox(), Container[int])
+    assert is_subalias(Pair[str, int], Container[int])
+    assert len(subalias_cache) == 2
+
+
+def test_cache_does_not_pin_classes():
+    class Local(Container[int]): ...
+
+    ref = weakref.ref(Local)
+    assert is_instance_of(Local(), Container[int])
+    del Local
+    gc.collect()
+    assert ref() is None
+
+
+def test_cache_does_not_pin_arg_classes():
+    subalias_cache.clear()
+    subalias_cache.max_entries_per_class = 4
+    try:
+        refs = []
+        for _ in range(8):
+
+            class Dyn: ...
+
+            assert is_subalias(Top[Dyn], Container[list[Dyn]])
+            refs.append(weakref.ref(Dyn))
+            del Dyn
+        assert len(subalias_cache) == 4
+        resolution_cache.clear()
+        substitution_cache.clear()
+        # Top[Dyn] is also held by typing's subscription cache
+        for cache_clear in typing._cleanups:  # type: ignore[attr-defined]
+            cache_clear()
+        gc.collect()
+        assert [ref() is None for ref in refs] == [True] * 4 + [False] * 4
+    finally:
+        subalias_cache.max_entries_per_class = 256
+        subalias_cache.clear()
@@ -0,0 +1,147 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from paramsight import (
+    get_resolved_typevars_for_base,
+    get_resolved_typevars_for_base_inst,
+    plan_cache,
+    resolution_cache,
+    set_resolution_engine,
+    takes_alias,
+)
+from paramsight._paramsight import _typenode_registry
+from paramsight.aliasclassmethod import _install_ga_proxy, _is_specialized_generic
+
+N_THREADS = 16
+N_ROUNDS = 40
+
+TYPES = [int, float, str, bytes, bool]
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class A[T]: ...
+
+
+class B[X, Y](A[Y]): ...
+
+
+class C[Z](B[str, Z]): ...
+
+
+class Left[T](A[T]): ...
+
+
+class Diamond[T](Left[T], C[T]): ...
+
+
+class Checked[T](A[T]):
+    @takes_alias
+    @classmethod
+    def resolved(cls):
+        return get_resolved_typevars_for_base(cls, A)
+
+
+class Patched[T](Checked[T]):
+    @takes_alias(patch_super=True)
+    @classmethod
+    def resolved(cls):
+        return super().resolved()
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def contended():
+    # switch threads as often as possible to shake out races on gil builds
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _hammer(work) -> list:
+    barrier = threading.Barrier(N_THREADS)
+
+    def run(i: int):
+        barrier.wait()
+        return [work(i, r) for r in range(N_ROUNDS)]
+
+    with ThreadPoolExecutor(N_THREADS) as pool:
+        return list(pool.map(run, range(N_THREADS)))
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("engine", ["graph", "mro", "flat"])
+def test_concurrent_resolution(contended, engine: str):
+    resolution_cache.clear()
+    plan_cache.clear()
+    _typenode_registry.clear()
+    set_resolution_engine(engine)
+    try:
+
+        def work(i: int, r: int):
+            t = TYPES[(i + r) % len(TYPES)]
+            assert get_resolved_typevars_for_base(Diamond[t], A) == (t,)
+            assert get_resolved_typevars_for_base(Diamond[t], B) == (str, t)
+            assert get_resolved_typevars_for_base(C[t], A) == (t,)
+            assert get_resolved_typevars_for_base_inst(Left[t](), A) == (t,)
+
+        _hammer(work)
+    finally:
+        set_resolution_engine("graph")
+
+
+def test_concurrent_takes_alias_calls_and_alias_creation(contended):
+    def work(i: int, r: int):
+        t = TYPES[(i + r) % len(TYPES)]
+        alias = Checked[t]
+        assert _is_specialized_generic(alias)
+        assert alias.resolved() == (t,)
+        assert Patched[t].resolved() == (t,)
+
+    _hammer(work)
+
+
+def test_concurrent_proxy_installation(contended):
+    classes = []
+    for _ in range(N_ROUNDS):
+
+        class Fresh(Checked[int]): ...
+
+        # undo what class creation installed, so the threads race to redo it
+        del Fresh._ga_proxy_installed__
+        classes.append(Fresh)
+
+    def install(i: int, r: int):
+        cls = classes[r]
+        _install_ga_proxy(cls)
+        assert cls._ga_proxy_installed__ is cls
+        assert cls.resolved() == (int,)
+
+    _hammer(install)
+
+
+def test_concurrent_subclass_creation(contended):
+    def work(i: int, r: int):
+        t = TYPES[(i + r) % len(TYPES)]
+
+        class Sub(Checked[t]): ...
+
+        assert Sub._ga_proxy_installed__ is Sub
+        assert Sub.resolved() == (t,)
+        assert get_resolved_typevars_for_base_inst(Sub(), A) == (t,)
+
+    _hammer(work)
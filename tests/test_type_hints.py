@@ -0,0 +1,82 @@
+from typing import Annotated, ClassVar
+
+from paramsight import invalidate, resolved_type_hints
+from paramsight._alias_cache import type_hints_cache
+from paramsight.generic_restored_basemodel.generic_basemodel import (
+    GbmTest,
+    GbmTest2,
+)
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class A[T]:
+    value: T
+    items: list[T]
+    tagged: Annotated[T, "tag"]
+    count: ClassVar[int]
+
+
+class Mid[U](A[list[U]]):
+    mid: U
+
+
+class Top[V](Mid[V]):
+    top: dict[str, V]
+
+
+class Override(A[int]):
+    value: bool
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_gbm_alias_applies_defaults():
+    hints = resolved_type_hints(GbmTest2[int])
+    assert hints["x1"] == GbmTest[int, int]
+    assert hints["x2"] == GbmTest[str, int]
+
+
+def test_annotations_of_every_class_in_the_mro_are_substituted():
+    assert resolved_type_hints(Top[int]) == {
+        "value": list[int],
+        "items": list[list[int]],
+        "tagged": list[int],
+        "count": ClassVar[int],
+        "mid": int,
+        "top": dict[str, int],
+    }
+
+
+def test_include_extras_keeps_annotated():
+    assert (
+        resolved_type_hints(A[int], include_extras=True)["tagged"]
+        == (Annotated[int, "tag"])
+    )
+
+
+def test_subclass_annotations_override():
+    hints = resolved_type_hints(Override)
+    assert hints["value"] is bool
+    assert hints["items"] == list[int]
+
+
+def test_unresolved_params_are_left_in_place():
+    (t,) = A.__type_params__
+    assert resolved_type_hints(A)["items"] == list[t]
+
+
+def test_results_are_cached_and_copied():
+    type_hints_cache.clear()
+    hints = resolved_type_hints(Top[str])
+    hints["extra"] = int
+    assert len(type_hints_cache) == 1
+    assert "extra" not in resolved_type_hints(Top[str])
+    assert len(type_hints_cache) == 1
+    invalidate(__name__)
+    assert len(type_hints_cache) == 0
@@ -0,0 +1,71 @@
+from typing import ClassVar
+
+import pytest
+from pydantic import BaseModel
+
+from paramsight import TypeParam, resolution_cache, takes_alias
+
+# ---------------------------------------------------------------------------
+# Classes under test
+# ---------------------------------------------------------------------------
+
+
+class Base[K, V]: ...
+
+
+class Foo[T](Base[str, T]):
+    key_type = TypeParam(Base, 0)
+    item_type = TypeParam(Base, 1)
+
+    @takes_alias
+    @classmethod
+    def describe(cls):
+        return cls.key_type, cls.item_type
+
+
+class IntFoo(Foo[int]): ...
+
+
+class Bounded[T: float](Base[T, T]):
+    bound_type = TypeParam(Base, 0, return_bound_as_fallback=True)
+
+
+class M[T](BaseModel, Base[T, bytes]):
+    field: T
+    key_type: ClassVar[type] = TypeParam(Base, 0)
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_read_from_aliases_and_classes():
+    assert Foo[int].item_type is int
+    assert Foo[int].key_type is str
+    assert IntFoo.item_type is int
+    assert Bounded[int].bound_type is int
+
+
+def test_read_from_instances():
+    assert Foo[bytes]().item_type is bytes
+    assert IntFoo().item_type is int
+    assert M[int](field=1).key_type is int
+    assert M[str].key_type is str
+
+
+def test_read_in_takes_alias_methods():
+    assert Foo[float].describe() == (str, float)
+    assert IntFoo.describe() == (str, int)
+
+
+def test_reads_hit_the_resolution_cache():
+    resolution_cache.clear()
+    assert Foo[int].item_type is int
+    assert Foo[int].item_type is int
+    assert (resolution_cache.hits, resolution_cache.misses) == (1, 1)
+
+
+def test_index_is_checked():
+    with pytest.raises(ValueError, match="no index 2"):
+        TypeParam(Base, 2)
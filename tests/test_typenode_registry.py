@@ -0,0 +1,115 @@
+import gc
+import weakref
+from typing import Generic, TypeVar
+
+import pytest
+from pydantic import BaseModel
+from resolvers import resolve_from_graph
+
+from paramsight import get_resolved_typevars_for_base, set_resolution_engine
+from paramsight._paramsight import TypeNode, _typenode_registry
+
+T = TypeVar("T")
+
+# ---------------------------------------------------------------------------
+# Diamond hierarchies
+# ---------------------------------------------------------------------------
+
+
+class A[T]: ...
+
+
+class Left[T](A[T]): ...
+
+
+class Right[T](A[T]): ...
+
+
+class Diamond[T](Left[T], Right[T]): ...
+
+
+class FixedDiamond(Left[int], Right[int]): ...
+
+
+class OldLeft(A[T], Generic[T]): ...
+
+
+class OldDiamond(OldLeft[T], Right[T], Generic[T]): ...
+
+
+class M[T](BaseModel, A[T]):
+    field: T
+
+
+class ModelDiamond[T](M[T], Right[T]): ...
+
+
+class Conflict(Left[int], Right[str]): ...
+
+
+class Dia2[X, Y](Left[X], Right[Y]): ...
+
+
+class Overridden[T](Conflict, Left[T]): ...
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+def test_shared_ancestor_node_is_built_once():
+    diamond = TypeNode.make(Diamond)
+    assert TypeNode.make(Diamond) is diamond
+    left, right = (base.orig for base in diamond.bases[:2])
+    assert left.bases[0].orig is right.bases[0].orig is TypeNode.make(A)
+
+
+def test_diamonds_resolve_instead_of_raising():
+    assert resolve_from_graph(Diamond[int], A) == (int,)
+    assert resolve_from_graph(FixedDiamond, A) == (int,)
+    assert resolve_from_graph(OldDiamond[str], A) == (str,)
+    assert resolve_from_graph(ModelDiamond[bytes], A) == (bytes,)
+    assert resolve_from_graph(ModelDiamond[bytes], Right) == (bytes,)
+
+
+def test_registry_does_not_pin_classes():
+    class Local(Left[int]): ...
+
+    TypeNode.make(Local)
+    assert Local in _typenode_registry
+    ref = weakref.ref(Local)
+    del Local
+    gc.collect()
+    assert ref() is None
+
+
+def test_search_only_expands_bases_leading_to_the_target():
+    class Unrelated[T]: ...
+
+    class Mixin[T](Unrelated[T]): ...
+
+    class Wide[T](Left[T], Mixin[str], M[int]): ...
+
+    assert resolve_from_graph(Wide[bytes], Left) == (bytes,)
+    wide = _typenode_registry[Wide]
+    assert wide.bases[0].orig is TypeNode.make(Left)
+    assert Mixin not in _typenode_registry
+    assert Unrelated not in _typenode_registry
+
+
+@pytest.mark.parametrize("engine", ["graph", "mro", "flat"])
+def test_conflicting_paths_raise(engine: str):
+    set_resolution_engine(engine)
+    try:
+        with pytest.raises(ValueError, match="conflicting values for typevar 0"):
+            get_resolved_typevars_for_base(Conflict, A)
+        with pytest.raises(ValueError, match="conflicting values for typevar 0"):
+            get_resolved_typevars_for_base(Dia2[int, int], A)
+        assert get_resolved_typevars_for_base(Dia2[int, str], Right) == (str,)
+        assert get_resolved_typevars_for_base(Diamond[int], A) == (int,)
+        assert get_resolved_typevars_for_base(FixedDiamond, A) == (int,)
+        # an alias's own parameter overrides the conflict below it
+        assert get_resolved_typevars_for_base(Overridden[bytes], A) == (bytes,)
+    finally:
+        set_resolution_engine("graph")